@@ -4,36 +4,49 @@ from smart_home.tools.spotify.spotify_agent import CallSpotifyAgentTool
 from smart_home.tools.zigbee.set_devices import SetDevicesTool
 from smart_home.tools.zigbee.get_devices import GetDevicesTool
 
-from smart_home.utils.home_utils import get_all_devices_summary, get_bedroom_temperature
+from smart_home.core.io import gather_blocking
+from smart_home.utils.home_utils import DeviceContextCache, get_temperature_for_prompt
 
 import logging
 logger = logging.getLogger(__name__)
 
 from smart_home.mcp_integration import create_mcp_tools
 
-HOME_SYSTEM_PROMPT_TEMPLATE = """
+# Static instructions first and volatile context last, so the start of the prompt stays
+# byte-identical across agents and providers can reuse their cached prefix
+HOME_SYSTEM_PROMPT_PREFIX = """
 You are a home assistant. Be as concise as possible, because your responses are to be read aloud. 
 Don't include any extraneous information, and don't be verbose. 
-The current bedroom temperature is {bedroom_temp}.
-You have access to the following devices:
+"""
+
+HOME_SYSTEM_PROMPT_CONTEXT = """You have access to the following devices:
 
 {devices_list}
+
+The current bedroom temperature is {bedroom_temp}.
 """
 
+# Split once at import; agents join the literals around the fetched values (no str.format per agent)
+_HOME_PROMPT_HEAD, _rest = (HOME_SYSTEM_PROMPT_PREFIX + HOME_SYSTEM_PROMPT_CONTEXT).split("{devices_list}")
+_HOME_PROMPT_MID, _HOME_PROMPT_TAIL = _rest.split("{bedroom_temp}")
+del _rest
+
 class HomeAgent(Agent):
 
     def __init__(self, session=None):
 
-        mcp_tools = create_mcp_tools(server_names=["fetch"])
-
-        try:
-            devices_list = get_all_devices_summary()
-        except Exception as e:
-            logger.warning(f"Failed to fetch devices for system prompt: {e}")
-            devices_list = "Unable to fetch device list. Ensure the Zigbee API server is running."
-        temp = get_bedroom_temperature()
+        # MCP discovery and both Zigbee lookups run concurrently
+        devices_list, temp, mcp_tools = gather_blocking(
+            DeviceContextCache.get,
+            get_temperature_for_prompt,
+            lambda: create_mcp_tools(server_names=["fetch"]),
+        )
 
-        system_prompt = HOME_SYSTEM_PROMPT_TEMPLATE.format(devices_list=devices_list, bedroom_temp=temp)
+        system_prompt = "".join((
+            _HOME_PROMPT_HEAD, devices_list,
+            _HOME_PROMPT_MID, temp,
+            _HOME_PROMPT_TAIL,
+        ))
         
         tools = [
             WeatherTool(),
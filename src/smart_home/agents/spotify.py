@@ -1,12 +1,14 @@
 # spotify_agent.py
-import os
-import requests
+import functools
+from typing import Optional
 
 from smart_home.core.agent import Agent
+from smart_home.core.cache import AGENT_PROMPT_CACHE_TTL, ttl_cache
 from smart_home.tools.spotify.play import SpotifyPlayTool
 from smart_home.tools.spotify.pause import SpotifyPauseTool
 from smart_home.tools.spotify.switch import SpotifyDeviceSwitchTool
 from smart_home.tools.spotify.volume import SpotifyVolumeTool
+from smart_home.tools.spotify.utils import _spotify
 
 
 SPOTIFY_SYSTEM_PROMPT = """
@@ -27,72 +29,85 @@ Guidelines:
 - If no devices are available, inform the user to open Spotify on a device.
 """
 
-def _fetch_spotify_devices_for_prompt(timeout: float = 6.0) -> list[dict]:
+def _fetch_spotify_devices_for_prompt() -> list[dict]:
     """
     Fetches the current user's Spotify Connect devices using env-provided OAuth creds.
     Returns a list of {'name': str, 'id': str} items. On any error, returns [].
+
+    Goes through the shared Spotify client, so the access token and keep-alive
+    connection are reused instead of refreshing the token on every agent.
     """
-    client_id = os.getenv("SPOTIFY_CLIENT_ID", "").strip()
-    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET", "").strip()
-    refresh_token = os.getenv("SPOTIFY_REFRESH_TOKEN", "").strip()
-    if not (client_id and client_secret and refresh_token):
+    if not (_spotify.client_id and _spotify.client_secret and _spotify.refresh_token):
         return []
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": os.getenv("SPOTIFY_USER_AGENT", "SmartHomeAssistant/1.0")})
-
-    # Get an access token via refresh token
     try:
-        token_resp = session.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "refresh_token", "refresh_token": refresh_token},
-            auth=(client_id, client_secret),
-            timeout=timeout,
-        )
-        token_resp.raise_for_status()
-        access_token = token_resp.json()["access_token"]
+        return _cached_prompt_devices()
     except Exception:
         return []
 
-    session.headers["Authorization"] = f"Bearer {access_token}"
 
-    # Query devices
+async def _afetch_spotify_devices_for_prompt() -> list[dict]:
+    """Async version of _fetch_spotify_devices_for_prompt(), for agents built on an event loop."""
+    if not (_spotify.client_id and _spotify.client_secret and _spotify.refresh_token):
+        return []
+
     try:
-        r = session.get("https://api.spotify.com/v1/me/player/devices", timeout=timeout)
-        r.raise_for_status()
-        devices = r.json().get("devices", [])
-        out = []
-        for d in devices:
-            name = (d.get("name") or "").strip()
-            dev_id = (d.get("id") or "").strip()
-            if name and dev_id:
-                out.append({"name": name, "id": dev_id})
-        return out
+        return await _acached_prompt_devices()
     except Exception:
         return []
 
 
-def _devices_prompt_fragment() -> str:
+# Errors propagate out of these (ttl_cache does not cache exceptions), so a transient
+# Spotify/auth failure is retried on the next agent instead of cached as "no devices"
+@ttl_cache(AGENT_PROMPT_CACHE_TTL)
+def _cached_prompt_devices() -> list[dict]:
+    return _prompt_devices(_spotify.list_devices())
+
+
+@ttl_cache(AGENT_PROMPT_CACHE_TTL)
+async def _acached_prompt_devices() -> list[dict]:
+    return _prompt_devices(await _spotify.alist_devices())
+
+
+def _prompt_devices(devices: list[dict]) -> list[dict]:
+    out = []
+    for d in devices:
+        name = (d.get("name") or "").strip()
+        dev_id = (d.get("id") or "").strip()
+        if name and dev_id:
+            out.append({"name": name, "id": dev_id})
+    return out
+
+
+def _devices_prompt_fragment(devices: tuple[tuple[str, str], ...]) -> str:
     """
     Builds a short prompt fragment with device name/id pairs.
     """
-    devices = _fetch_spotify_devices_for_prompt()
     if not devices:
         return "\nKnown Spotify devices: none detected.\n"
 
     lines = ["\nKnown Spotify devices (name → id):"]
-    for d in devices:
+    for name, dev_id in devices:
         # Keep it compact and unambiguous
-        lines.append(f"- {d['name']} (id: {d['id']})")
+        lines.append(f"- {name} (id: {dev_id})")
     lines.append("")  # trailing newline
     return "\n".join(lines)
 
 
+@functools.lru_cache(maxsize=8)
+def _system_prompt_for(devices: tuple[tuple[str, str], ...]) -> str:
+    # Devices rarely change, so the full prompt is built once per distinct device set
+    return SPOTIFY_SYSTEM_PROMPT + _devices_prompt_fragment(devices)
+
+
 class SpotifyAgent(Agent):
 
-    def __init__(self, session=None):
+    def __init__(self, session=None, *, devices: Optional[list[dict]] = None):
         # Inject devices (name/id pairs) directly into the system prompt at construction time.
-        system_prompt = SPOTIFY_SYSTEM_PROMPT + _devices_prompt_fragment()
+        # Fetched here unless the caller already has them (see acreate).
+        if devices is None:
+            devices = _fetch_spotify_devices_for_prompt()
+        system_prompt = _system_prompt_for(tuple((d["name"], d["id"]) for d in devices))
 
         super().__init__(
             system_prompt=system_prompt,
@@ -106,3 +121,9 @@ class SpotifyAgent(Agent):
             agent_type="spotify",
             session=session,
         )
+
+    @classmethod
+    async def acreate(cls, session=None) -> "SpotifyAgent":
+        """Build a SpotifyAgent from async code without blocking the event loop on the devices fetch."""
+        devices = await _afetch_spotify_devices_for_prompt()
+        return cls(session=session, devices=devices)
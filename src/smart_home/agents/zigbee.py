@@ -6,19 +6,16 @@ import logging
 from smart_home.core.agent import Agent
 from smart_home.tools.zigbee.set_devices import SetDevicesTool
 from smart_home.tools.zigbee.get_devices import GetDevicesTool
-from smart_home.utils.home_utils import get_all_devices_summary, get_bedroom_temperature
+from smart_home.core.io import gather_blocking
+from smart_home.utils.home_utils import DeviceContextCache, get_temperature_for_prompt
 
 logger = logging.getLogger(__name__)
 
-ZIGBEE_SYSTEM_PROMPT_TEMPLATE = """
+# Static instructions first and volatile context last, so the start of the prompt stays
+# byte-identical across agents and providers can reuse their cached prefix
+ZIGBEE_SYSTEM_PROMPT_PREFIX = """
 You are a Zigbee smart home assistant. You help users control their smart home devices.
 
-You have access to the following devices:
-
-{devices_list}
-
-The current bedroom temperature is {bedroom_temp}.
-
 When controlling devices:
 - Use get_zigbee_devices to check current state of devices (power, brightness, temperature, etc.)
 - Use set_zigbee_devices to control one or multiple devices
@@ -29,17 +26,29 @@ When controlling devices:
 Be very concise in your responses. They are read aloud, so avoid unnecessary words or phrases.
 """
 
+ZIGBEE_SYSTEM_PROMPT_CONTEXT = """
+You have access to the following devices:
+
+{devices_list}
+
+The current bedroom temperature is {bedroom_temp}.
+"""
+
+# Split once at import; agents join the literals around the fetched values (no str.format per agent)
+_ZIGBEE_PROMPT_HEAD, _rest = (ZIGBEE_SYSTEM_PROMPT_PREFIX + ZIGBEE_SYSTEM_PROMPT_CONTEXT).split("{devices_list}")
+_ZIGBEE_PROMPT_MID, _ZIGBEE_PROMPT_TAIL = _rest.split("{bedroom_temp}")
+del _rest
+
 class ZigbeeAgent(Agent):
 
     def __init__(self, model: Optional[str] = None, *, include_time: bool = True, session=None):
-        # Fetch device list and build system prompt
-        try:
-            devices_list = get_all_devices_summary()
-        except Exception as e:
-            logger.warning(f"Failed to fetch devices for system prompt: {e}")
-            devices_list = "Unable to fetch device list. Ensure the Zigbee API server is running."
-        temp = get_bedroom_temperature()
-        system_prompt = ZIGBEE_SYSTEM_PROMPT_TEMPLATE.format(devices_list=devices_list, bedroom_temp=temp)
+        # Fetch device list and temperature concurrently, then build system prompt
+        devices_list, temp = gather_blocking(DeviceContextCache.get, get_temperature_for_prompt)
+        system_prompt = "".join((
+            _ZIGBEE_PROMPT_HEAD, devices_list,
+            _ZIGBEE_PROMPT_MID, temp,
+            _ZIGBEE_PROMPT_TAIL,
+        ))
 
         super().__init__(
             model=model,
@@ -0,0 +1,19 @@
+# src/smart_home/config/env.py
+import os
+
+_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load .env into os.environ, once per process. Every module that reads settings at
+    import goes through here, so the file is found and parsed a single time.
+    Set SMART_HOME_LOAD_DOTENV=0 to skip it (e.g. when the environment is already set).
+    """
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if os.getenv("SMART_HOME_LOAD_DOTENV", "1") == "1":
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
@@ -1,16 +1,35 @@
 # src/smart_home/config/logging.py
 import logging
-import json
 import sys
 import os
-from datetime import datetime, timezone
+import copy
+import time
+import queue
+import atexit
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+# Extra context fields copied from `extra={...}` into the JSON payload when present
+_EXTRA_FIELDS = ("agent_id", "tool_name", "provider", "model")
+
 
 class JsonFormatter(logging.Formatter):
+    # Records arrive in bursts within the same second: the formatted second is reused
+    _stamp_second = None
+    _stamp = ""
+
+    def _timestamp(self, record):
+        second = int(record.created)
+        if second != self._stamp_second:
+            self._stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._stamp_second = second
+        return f"{self._stamp}.{int(record.msecs):03d}Z"
+
     def format(self, record):
         payload = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(record),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -20,15 +39,82 @@ class JsonFormatter(logging.Formatter):
         }
 
         # Add extra context fields if present
-        for field in ['agent_id', 'tool_name', 'provider', 'model']:
-            if hasattr(record, field):
-                payload[field] = getattr(record, field)
+        fields = record.__dict__
+        for field in _EXTRA_FIELDS:
+            value = fields.get(field)
+            if value is not None:
+                payload[field] = value
 
         # Include exception info if present
         if record.exc_info:
             payload['exception'] = self.formatException(record.exc_info)
 
-        return json.dumps(payload)
+        # default=str: extras can carry arbitrary objects
+        return orjson.dumps(payload, default=str).decode()
+
+class _FileQueueHandler(QueueHandler):
+    """
+    Hands records to the file-writing thread. Only the message is resolved here (its args
+    may be mutated later); exc_info is kept so JsonFormatter still gets the exception.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class FastRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that keeps the file size in a counter. The stock handler formats
+    every record twice (once to measure it) and stats/seeks the file on each emit.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._size = None  # bytes in the current file, read once from the stream
+        # Text-mode writes turn each "\n" into os.linesep ("\r\n" on Windows)
+        self._newline_extra = len(os.linesep) - 1
+
+    def shouldRollover(self, record):
+        # Decided in emit(), from the counter
+        return False
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0:
+                if self._size is None:
+                    self.stream.seek(0, 2)
+                    self._size = self.stream.tell()
+                size = self._byte_size(msg)
+                if self._size and self._size + size >= self.maxBytes:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                    self._size = 0
+            self.stream.write(msg)
+            self.flush()
+            if self._size is not None:
+                self._size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _byte_size(self, msg):
+        """Bytes `msg` takes on disk: encoded length plus newline translation."""
+        size = len(msg) if msg.isascii() else len(msg.encode(self.encoding or "utf-8"))
+        if self._newline_extra:
+            size += self._newline_extra * msg.count("\n")
+        return size
+
+
+# Background thread that formats and writes file records (see configure)
+_file_listener = None
 
 class ConsoleFormatter(logging.Formatter):
     """Concise formatter for console output."""
@@ -42,11 +128,15 @@ class ConsoleFormatter(logging.Formatter):
         'RESET': '\033[0m'
     }
 
+    # Colored first letter per level, built once: [L] prefix is a single dict lookup per record
+    COLORED_LEVELS = {
+        getattr(logging, name): f"{color}{name[0]}\033[0m"
+        for name, color in COLORS.items() if name != 'RESET'
+    }
+
     def format(self, record):
-        # Color the level name
-        level_color = self.COLORS.get(record.levelname, '')
-        reset = self.COLORS['RESET']
-        level = f"{level_color}{record.levelname[0]}{reset}"  # Just first letter
+        # Color the level name (just first letter); custom levels go uncolored
+        level = self.COLORED_LEVELS.get(record.levelno) or record.levelname[0]
 
         # Build context string from extra fields
         context_parts = []
@@ -66,7 +156,20 @@ class ConsoleFormatter(logging.Formatter):
 
         return msg
 
-def configure(level=None, log_file=None):
+def _stop_file_listener():
+    # Flush whatever is still queued before the interpreter exits
+    if _file_listener is not None:
+        _file_listener.stop()
+
+def _level_number(level):
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(str(level).strip().upper())
+    if not isinstance(number, int):
+        raise ValueError(f"Unknown log level: {level!r}")
+    return number
+
+def configure(level=None, log_file=None, file_level=None):
     """
     Configure logging with JSON formatting and optional file output.
 
@@ -75,10 +178,19 @@ def configure(level=None, log_file=None):
                Defaults to LOG_LEVEL env var or INFO.
         log_file: Optional file path for persistent logs.
                   Defaults to data/logs/app.log if not specified.
+        file_level: Level for the log file. Defaults to LOG_FILE_LEVEL env var,
+                    or the console level.
+
+    The root logger is set to the lower of the two levels, so records no handler would
+    write (and `logger.isEnabledFor` guarded work) are skipped at the call site.
     """
-    # Determine log level from env var or parameter
+    # Determine log levels from env vars or parameters
     if level is None:
-        level = os.getenv("LOG_LEVEL", "INFO").upper()
+        level = os.getenv("LOG_LEVEL", "INFO")
+    level = _level_number(level)
+    if file_level is None:
+        file_level = os.getenv("LOG_FILE_LEVEL") or level
+    file_level = _level_number(file_level)
 
     # Determine log file path
     if log_file is None:
@@ -101,23 +213,35 @@ def configure(level=None, log_file=None):
     # Uses JSON formatter for structured logs
     if log_file:
         json_formatter = JsonFormatter()
-        file_handler = RotatingFileHandler(
+        file_handler = FastRotatingFileHandler(
             log_file,
             maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5
+            backupCount=5,
+            encoding="utf-8",  # orjson writes non-ASCII as-is
         )
         file_handler.setFormatter(json_formatter)
-        file_handler.setLevel(logging.DEBUG)  # Always log everything to file
-        handlers.append(file_handler)
+        file_handler.setLevel(file_level)
+
+        # JSON formatting and the disk write happen on a listener thread; logging
+        # calls on the agent's thread only enqueue the record
+        global _file_listener
+        if _file_listener is not None:
+            _file_listener.stop()
+        else:
+            atexit.register(_stop_file_listener)
+        log_queue = queue.SimpleQueue()
+        _file_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _file_listener.start()
+        handlers.append(_FileQueueHandler(log_queue))
 
     # Configure root logger
     root = logging.getLogger()
-    root.setLevel(logging.DEBUG)  # Capture everything, handlers filter by level
+    root.setLevel(min(level, file_level) if log_file else level)
     root.handlers[:] = handlers
 
     # Silence noisy third-party libraries (unless user explicitly wants DEBUG for everything)
     # These libraries spam debug logs with internal operations
-    if level == "DEBUG":
+    if min(level, file_level) <= logging.DEBUG:
         # In DEBUG mode, still silence extremely verbose libraries
         logging.getLogger("comtypes").setLevel(logging.WARNING)
         logging.getLogger("urllib3").setLevel(logging.INFO)
@@ -1,37 +1,276 @@
+import io
 import os
-import json
-import requests
-import random
-import string
+import queue
+import asyncio
+import orjson
+import secrets
 import logging
+import threading
+import weakref
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Iterable, Optional, List, Dict, Any
-from dotenv import load_dotenv
+from typing import AsyncIterator, Callable, Iterable, Optional, List, Dict, Any, Tuple, Union, TYPE_CHECKING
 
-load_dotenv(override=True)
+from smart_home.config.env import load_env
+from smart_home.core.cache import ResponseCache
+
+# requests/httpx (and their TLS stacks) are imported on first use, not at import time
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+load_env()
 
 logger = logging.getLogger(__name__)
 
-PROVIDER = os.getenv("PROVIDER").strip().lower()
+PROVIDER = os.getenv("PROVIDER", "").strip().lower()
 OPENAI_API_BASE = "https://api.openai.com/v1"
+OLLAMA_CHAT_URL = "http://localhost:11434/api/chat"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
-DEFAULT_MODEL = os.getenv("OPENAI_MODEL").strip() if PROVIDER == "openai" else os.getenv("OLLAMA_MODEL", "llama3.1:8b").strip()
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini").strip() if PROVIDER == "openai" else os.getenv("OLLAMA_MODEL", "llama3.1:8b").strip()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Tool-call arguments: a dict (Ollama) or the raw JSON string from the Responses API, parsed on the tool's worker
+ToolArgs = Union[Dict[str, Any], str]
+
+# Opt-in prompt -> response cache shared by all agents (text-only turns, see ResponseCache)
+_RESPONSE_CACHE = (
+    ResponseCache(ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")))
+    if os.getenv("RESPONSE_CACHE", "False").strip().lower() == "true"
+    else None
+)
+# Opt-in paraphrase tier: also match prompts that normalize to the same words (see ResponseCache.make_loose_key)
+_SEMANTIC_CACHE = (
+    ResponseCache(ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")))
+    if os.getenv("SEMANTIC_CACHE", "False").strip().lower() == "true"
+    else None
+)
+
+# Opt-in: stream a "[<tool> done]" line as each tool call of a turn completes, so a
+# listener isn't left waiting in silence between the tool calls and the answer
+_TOOL_PROGRESS = os.getenv("TOOL_PROGRESS", "False").strip().lower() == "true"
+
+# Max bytes taken from the socket per read on the streaming paths
+_READ_SIZE = 65536
+
+# Max tokens buffered between the stream-reader thread and a slow consumer (see Agent._buffered)
+_STREAM_QUEUE_SIZE = 64
+_STREAM_DONE = object()
+
+# Shared pool for running a turn's tool calls concurrently (tools are I/O-bound HTTP calls)
+_TOOL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+
+_HTTP_SESSION: Optional["requests.Session"] = None
+_HTTP_SESSION_LOCK = threading.Lock()
+
+
+def _http_session() -> "requests.Session":
+    """
+    Process-wide pooled requests.Session (created on first use). Only failures where the
+    server never processed the request are retried: connect errors, and 429/503 replies.
+    A chat or tool-bearing POST that fails mid-read is not re-sent.
+    """
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        with _HTTP_SESSION_LOCK:
+            if _HTTP_SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=2,
+                    read=0,
+                    other=0,
+                    backoff_factor=0.2,
+                    status_forcelist=[429, 503],
+                    allowed_methods=frozenset({"GET", "POST"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _HTTP_SESSION = session
+    return _HTTP_SESSION
+
+
+# Pooled AsyncClient per event loop, so astream() (and async tools) reuse TCP/TLS connections across turns.
+# (An AsyncClient is bound to the loop it first ran on, so it can't be a single global.)
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=16, keepalive_expiry=30)
+        )
+        _ASYNC_CLIENTS[loop] = client
+    return client
 
 
 def _generate_agent_id(length: int = 8) -> str:
-    """Generate a random agent ID using alphanumeric characters."""
-    characters = string.ascii_lowercase + string.digits
-    return ''.join(random.choices(characters, k=length))
+    """Generate a random agent ID of `length` lowercase hex characters."""
+    return secrets.token_hex((length + 1) // 2)[:length]
+
+
+class _LineFramer:
+    """
+    Split a byte stream into newline-delimited records (shared by the sync and async readers).
+    A trailing CR is dropped; blank lines are skipped unless `keep_blank` (SSE needs them).
+    """
+
+    def __init__(self, keep_blank: bool = False) -> None:
+        self._buf = bytearray()
+        self._keep_blank = keep_blank
+
+    def feed(self, data: bytes) -> List[bytes]:
+        buf = self._buf
+        buf += data
+        nl = buf.rfind(b"\n")
+        if nl < 0:
+            return []
+        # Everything up to the last newline is split in one C-level pass instead of a
+        # Python loop per line; the partial line after it stays buffered
+        block = bytes(buf[:nl])
+        del buf[:nl + 1]
+        if b"\r" in block:
+            block = block.replace(b"\r\n", b"\n")
+            if block.endswith(b"\r"):
+                block = block[:-1]
+        records = block.split(b"\n")
+        if not self._keep_blank:
+            records = [r for r in records if r]
+        return records
+
+    def tail(self) -> List[bytes]:
+        """Whatever is left once the stream ends (a final record without a trailing newline)."""
+        return [bytes(self._buf)] if self._buf.strip() else []
+
+
+class _SSEParser:
+    """
+    Line-driven SSE parser for the Responses API (shared by the sync and async readers).
+    Works on raw line bytes; flushes on blank lines, handles multi-line JSON, ignores
+    comments; sets .done on [DONE]. Data lines accumulate in one reused bytearray and
+    only the assembled payload is ever parsed.
+    """
+
+    def __init__(self) -> None:
+        self.event: Optional[str] = None
+        self._data = bytearray()
+        self._has_data = False
+        self.done = False
+        self._first = True
+
+    def feed(self, line: bytes) -> Optional[Tuple[Optional[str], Any]]:
+        if self._first:
+            # A UTF-8 BOM can only precede the very first line of the stream
+            self._first = False
+            if line.startswith(b"\xef\xbb\xbf"):
+                line = line[3:]
+        if not line:
+            return self.flush()
+        # One dict lookup on the first byte picks the field handler
+        self._HANDLERS.get(line[:1], _SSEParser._on_other)(self, line)
+        return None
+
+    def _on_data(self, line: bytes) -> None:
+        if not line.startswith(b"data:"):
+            return self._on_other(line)
+        # "data: {...}" is the common form: drop the single space by offset, no strip()
+        self._append(line[6:] if line[5:6] == b" " else line[5:])
+
+    def _on_event(self, line: bytes) -> None:
+        if not line.startswith(b"event:"):
+            return self._on_other(line)
+        self.event = line[6:].strip().decode() or None
+
+    def _on_comment(self, line: bytes) -> None:
+        pass  # comment/heartbeat
+
+    def _on_other(self, line: bytes) -> None:
+        # Fallback (treat unknown fields as data continuation)
+        self._append(line)
+
+    _HANDLERS = {b"d": _on_data, b"e": _on_event, b":": _on_comment}
+
+    def _append(self, data: bytes) -> None:
+        if self._has_data:
+            self._data += b"\n"
+        self._data += data
+        self._has_data = True
+
+    def flush(self) -> Optional[Tuple[Optional[str], Any]]:
+        if not self._has_data:
+            return None
+        payload = bytes(self._data)
+        self._data.clear()
+        self._has_data = False
+        if payload.strip() == b"[DONE]":
+            self.done = True
+            return None
+        try:
+            data = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            data = {"raw": payload.decode("utf-8", "replace")}
+        event, self.event = self.event, None
+        return event, data
+
+
+@dataclass(slots=True)
+class _PendingCall:
+    """A Responses API function call being assembled from stream events."""
+    name: str = ""
+    call_id: Optional[str] = None
+    args: List[str] = field(default_factory=list)  # argument fragments, a fallback for args_json
+    args_json: str = ""
+    ready: bool = False
+    started: bool = False
+    handle: Any = None  # Future/task from start_tool (None for sequential tools)
+
+
+def _is_tool_trace(message: Dict[str, Any]) -> bool:
+    """True for tool-call requests and tool results, in either provider's history format."""
+    if message.get("type") in ("function_call", "function_call_output"):
+        return True
+    role = message.get("role")
+    return role == "tool" or (role == "assistant" and bool(message.get("tool_calls")) and not message.get("content"))
 
 # ---------- Base Tool Class ----------
 class Tool:
     """Base tool class. Subclasses should implement .call(**kwargs) -> str."""
+
+    # Tools that mutate shared state can set this to run one at a time, in call order,
+    # instead of alongside the other tool calls of the same turn.
+    sequential: bool = False
+
     def __init__(self, name: str, description: str, params: dict, session=None):
         self.name = name
         self.description = description
         self.parameters = params
         self.state_session = session  # Optional session reference for state management (renamed to avoid conflicts with requests.Session)
         self.schema = self.construct_schema()
+        # Serialized once per tool (keys sorted, so it is byte-stable); agents splice these into requests
+        self._schema_bytes: Optional[bytes] = (
+            orjson.dumps(self.schema, option=orjson.OPT_SORT_KEYS) if self.schema is not None else None
+        )
+
+    async def acall(self, **kwargs) -> str:
+        """Async entry point used by Agent.astream. Tools with native async I/O override this."""
+        if asyncio.iscoroutinefunction(self.call):
+            return await self.call(**kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            _TOOL_POOL, functools.partial(self.call, **kwargs)
+        )
 
     def construct_schema(self) -> dict:
         if PROVIDER == "openai":
@@ -83,29 +322,61 @@ class Agent:
         provider: Optional[str] = None,
         agent_type: str = "agent",
         session=None,
+        max_history_messages: Optional[int] = 40,
+        cache_buffer: int = 8,
+        keep_tool_turns: Optional[int] = 2,
+        tool_progress: Optional[bool] = None,
+        share_messages: bool = False,
     ) -> None:
         self.model: str = model or DEFAULT_MODEL
         self.system_prompt: str = system_prompt
         self.session = session  # Optional session reference for state management
         self.tools: List[Tool] = list(tools or [])
+        self._tools_by_name: Dict[str, Tool] = {tool.name: tool for tool in self.tools}
         # Pass session to all tools (overwrite any existing session)
         for tool in self.tools:
             if hasattr(tool, 'state_session'):
                 tool.state_session = session
-        # Build tools schema, filtering out None schemas (e.g., from MCP tools on unsupported providers)
-        self.tools_schema: List[Dict[str, Any]] = [
-            tool.schema for tool in self.tools if tool.schema is not None
-        ] if self.tools else []
-        self.messages: List[Dict[str, Any]] = list(messages or [])
+        # Build tools schema, filtering out None schemas (e.g., from MCP tools on unsupported providers).
+        # Tools are ordered by name and every schema's keys are sorted, so the serialized tool block
+        # (part of the cached prompt prefix) is byte-identical no matter how the tools were assembled.
+        # The block is joined from each tool's pre-serialized schema and spliced into every request.
+        self._tools_schema_bytes: bytes = b"[" + b",".join(
+            tool._schema_bytes for tool in sorted(self.tools, key=lambda t: t.name) if tool._schema_bytes is not None
+        ) + b"]"
+        self.tools_schema: List[Dict[str, Any]] = orjson.loads(self._tools_schema_bytes)
+        # share_messages: use the caller's list as this agent's history instead of copying it
+        # (for sub-agents whose history is owned by the session). The system prompt and time
+        # messages below are then appended to that list, and trimming edits it in place.
+        self.messages: List[Dict[str, Any]] = (
+            messages if share_messages and messages is not None else list(messages or [])
+        )
+        # id(message) -> (message, its JSON), see _history_bytes
+        self._encoded_messages: Dict[int, Tuple[Dict[str, Any], bytes]] = {}
         self.agent_id: str = _generate_agent_id()
         self.agent_type: str = agent_type
+        # Constant tail of every Responses API request; prompt_cache_key routes requests that share
+        # this agent's static prefix to the same prompt cache
+        self._openai_body_tail: bytes = (
+            b',"tool_choice":"auto","parallel_tool_calls":true,"stream":true,"prompt_cache_key":'
+            + orjson.dumps(f"smart-home-{agent_type}") + b"}"
+        )
+        # History window and tool-trace compaction (None disables either); see _trim_history
+        self.max_history_messages: Optional[int] = max_history_messages
+        self.cache_buffer: int = cache_buffer
+        self.keep_tool_turns: Optional[int] = keep_tool_turns
+        # Progress lines are stream output only; they never enter the history (see _finish_tools)
+        self.tool_progress: bool = _TOOL_PROGRESS if tool_progress is None else tool_progress
+        self._prewarm_thread: Optional[threading.Thread] = None
+
+        # The system prompt is kept byte-identical across agents and turns so provider-side
+        # prefix caching can reuse it; volatile context (the time) goes in its own message after it.
+        if self.system_prompt:
+            self.messages.append({"role": "system", "content": self.system_prompt})
 
         if include_time:
             now = datetime.now().isoformat(timespec="minutes")
-            self.system_prompt += f" It is {now}"
-
-        if self.system_prompt:
-            self.messages.append({"role": "system", "content": self.system_prompt})
+            self.messages.append({"role": "system", "content": f"It is {now}"})
 
         self.provider = provider or PROVIDER
         if self.provider == "openai":
@@ -116,38 +387,258 @@ class Agent:
             extra={"agent_id": self.agent_id, "provider": self.provider, "model": self.model}
         )
 
+    @property
+    def _http(self) -> "requests.Session":
+        # Keep-alive HTTP session, shared by all agents across turns and tool-loop iterations
+        return _http_session()
+
     # ---------- Public API ----------
 
+    def prewarm(self) -> None:
+        """
+        Get the provider ready for the next request while the user is still talking or
+        typing: on a background thread, open (and pool) the connection to the OpenAI API,
+        or have Ollama load the model into memory (a chat request with no messages).
+        Skipped while this agent's previous prewarm is still in flight.
+        """
+        if self._prewarm_thread is not None and self._prewarm_thread.is_alive():
+            return
+        self._prewarm_thread = threading.Thread(target=self._prewarm, name=f"prewarm-{self.agent_id}", daemon=True)
+        self._prewarm_thread.start()
+
+    def _prewarm(self) -> None:
+        try:
+            if self.provider == "openai":
+                resp = self._http.get(f"{OPENAI_API_BASE}/models/{self.model}", headers=self._openai_headers(), timeout=10)
+            else:
+                body = orjson.dumps({"model": self.model, "messages": []})
+                resp = self._http.post(OLLAMA_CHAT_URL, data=body, headers=_JSON_HEADERS, timeout=60)
+            # Read the (small) body so the connection goes back to the pool
+            resp.content
+        except Exception as ex:
+            logger.debug(f"Prewarm failed: {ex}", extra={"agent_id": self.agent_id})
+
     def stream(self, prompt: str, max_tool_loops: int = 3) -> Iterable[str]:
         """Stream response, executing tools in a loop until final answer is reached."""
         self.messages.append({"role": "user", "content": prompt})
+        self._trim_history()
+
+        cache_keys, hit = self._cache_lookup()
+        if hit is not None:
+            yield hit
+            return
+
+        start = len(self.messages)
+        parts: List[str] = []
+        if self.provider == "openai":
+            inner = self._stream_openai(max_tool_loops=max_tool_loops)
+        else:
+            inner = self._stream_ollama(max_tool_loops=max_tool_loops)
+        for chunk in self._buffered(inner):
+            parts.append(chunk)
+            yield chunk
+
+        self._cache_store(cache_keys, start, parts)
+
+    def _buffered(self, inner: Iterable[str]) -> Iterable[str]:
+        """
+        Read `inner` on its own thread and hand tokens over through a bounded queue, so a slow
+        consumer (TTS, a piped stdout) only stalls the socket reader once the queue is full.
+        If the consumer stops early (break, close, Ctrl-C), the reader is stopped at its next
+        token and joined, so it never edits the history while the next turn is running.
+        """
+        tokens: "queue.Queue[Any]" = queue.Queue(maxsize=_STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    tokens.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for chunk in inner:
+                    if not put(chunk):
+                        return
+            except BaseException as ex:
+                put(ex)  # re-raised on the consumer side
+            else:
+                put(_STREAM_DONE)
+            finally:
+                inner.close()
+
+        reader = threading.Thread(target=produce, name=f"stream-{self.agent_id}", daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = tokens.get()
+                if item is _STREAM_DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Consumer finished or walked away: let the reader stop and close the response,
+            # and wait for it so a tool still running in this turn can't race the next one
+            stop.set()
+            reader.join()
+
+    async def astream(self, prompt: str, max_tool_loops: int = 3) -> AsyncIterator[str]:
+        """
+        Async version of stream(). Network reads run on the event loop, async tools are
+        awaited directly and sync tools run on the shared tool pool, so several agents
+        (or a turn's tool calls) can be in flight at once.
+        """
+        self.messages.append({"role": "user", "content": prompt})
+        self._trim_history()
+
+        cache_keys, hit = self._cache_lookup()
+        if hit is not None:
+            yield hit
+            return
+
+        start = len(self.messages)
+        parts: List[str] = []
+        client = get_async_client()
         if self.provider == "openai":
-            yield from self._stream_openai(max_tool_loops=max_tool_loops)
+            inner = self._astream_openai(client, max_tool_loops=max_tool_loops)
+        else:
+            inner = self._astream_ollama(client, max_tool_loops=max_tool_loops)
+        async for chunk in inner:
+            parts.append(chunk)
+            yield chunk
+
+        self._cache_store(cache_keys, start, parts)
+
+    # ---------- History window ----------
+
+    def _trim_history(self) -> None:
+        """
+        Keep the history bounded. The leading system messages stay pinned, and nothing is
+        touched until the window overflows by `cache_buffer` messages, so the request prefix
+        stays byte-identical (and provider-cacheable) for several turns between cuts. That
+        one pass compacts old tool traces and then cuts the window; cuts land on a user
+        message, so a tool call is never separated from its output.
+        """
+        limit = self.max_history_messages
+        if limit is None:
+            # No window: compaction is the only cut, on the same buffered schedule
+            self._compact_tool_traces(min_dropped=self.cache_buffer)
+            return
+        if len(self.messages) <= limit + self.cache_buffer:
+            return
+
+        self._compact_tool_traces()
+        if len(self.messages) <= limit:
+            return
+
+        pinned = 0
+        while pinned < len(self.messages) and self.messages[pinned].get("role") == "system":
+            pinned += 1
+
+        cut = max(pinned, len(self.messages) - limit)
+        while cut < len(self.messages) and self.messages[cut].get("role") != "user":
+            cut += 1
+        if cut >= len(self.messages) or cut == pinned:
+            return
+
+        # In place: the session holds a reference to this list
+        del self.messages[pinned:cut]
+        logger.debug(
+            f"Trimmed history to {len(self.messages)} messages",
+            extra={"agent_id": self.agent_id, "dropped": cut - pinned}
+        )
+
+    def _compact_tool_traces(self, min_dropped: int = 1) -> None:
+        """
+        Drop tool calls and tool outputs from turns older than the last `keep_tool_turns`
+        user turns (0 drops every trace in the history); the user/assistant text of those
+        turns stays. Skipped unless at least `min_dropped` messages would go.
+        """
+        if self.keep_tool_turns is None:
+            return
+
+        boundary = None
+        if self.keep_tool_turns <= 0:
+            boundary = len(self.messages)
         else:
-            yield from self._stream_ollama(max_tool_loops=max_tool_loops)
+            seen = 0
+            for i in range(len(self.messages) - 1, -1, -1):
+                if self.messages[i].get("role") == "user":
+                    seen += 1
+                    if seen == self.keep_tool_turns:
+                        boundary = i
+                        break
+        if not boundary:
+            return
+
+        head = self.messages[:boundary]
+        kept = [m for m in head if not _is_tool_trace(m)]
+        if len(head) - len(kept) < min_dropped:
+            return
+
+        # In place: the session holds a reference to this list
+        self.messages[:boundary] = kept
+        logger.debug(
+            f"Compacted {len(head) - len(kept)} old tool messages",
+            extra={"agent_id": self.agent_id}
+        )
+
+    # ---------- Response cache ----------
+
+    def _cache_lookup(self) -> Tuple[List[Tuple[ResponseCache, str]], Optional[str]]:
+        """
+        Return (cache_keys, cached_text) for the request about to be sent. The exact tier is
+        checked before the paraphrase tier. On a hit the cached assistant message is appended to history.
+        """
+        cache_keys: List[Tuple[ResponseCache, str]] = []
+        if _RESPONSE_CACHE is not None:
+            cache_keys.append((_RESPONSE_CACHE, ResponseCache.make_key(self.model, self.messages, self.tools_schema)))
+        if _SEMANTIC_CACHE is not None:
+            context = self.messages[-2] if len(self.messages) > 1 else None
+            cache_keys.append((_SEMANTIC_CACHE, ResponseCache.make_loose_key(
+                self.model, self.system_prompt, self.tools_schema, context, self.messages[-1]["content"]
+            )))
+
+        for cache, key in cache_keys:
+            hit = cache.get(key)
+            if hit is not None:
+                text, message = hit
+                self.messages.append(dict(message))
+                return cache_keys, text
+        return cache_keys, None
+
+    def _cache_store(self, cache_keys: List[Tuple[ResponseCache, str]], start: int, parts: List[str]) -> None:
+        # Only cache plain answers: a turn that ran tools (or failed) must hit the model again
+        new_messages = self.messages[start:]
+        if cache_keys and len(new_messages) == 1 and new_messages[0].get("role") == "assistant":
+            text = "".join(parts)
+            for cache, key in cache_keys:
+                cache.put(key, text, dict(new_messages[0]))
 
     # ---------- Ollama path ----------
 
     def _stream_ollama(self, max_tool_loops: int) -> Iterable[str]:
+        import requests
+
         loop_count = 0
         while True:
             if loop_count >= max_tool_loops:
                 logger.warning("Max tool loop limit reached", extra={"agent_id": self.agent_id, "max_loops": max_tool_loops})
                 break
 
-            url = "http://localhost:11434/api/chat"
-            data = {
-                "model": self.model,
-                "messages": self.messages,
-                "tools": self.tools_schema,
-                "stream": True
-            }
-
-            assistant_reply = ""
+            assistant_reply_parts: List[str] = []
             tool_used = False
+            # (tool_call, name, args, future) for tools started while the stream is still being read
+            started_calls: List[Tuple[Dict[str, Any], str, Dict[str, Any], Optional[Future]]] = []
+            start_tool = self._dedup_starts(self._start_tool)
 
             try:
-                with requests.post(url, json=data, stream=True, timeout=120) as response:
+                with self._http.post(OLLAMA_CHAT_URL, data=self._ollama_body(), headers=_JSON_HEADERS, stream=True, timeout=120) as response:
                     if response.status_code != 200:
                         logger.error(
                             f"Ollama API error: {response.text}",
@@ -155,73 +646,186 @@ class Agent:
                         )
                         return
 
-                    for line in response.iter_lines():
-                        if not line:
+                    for line in self._ndjson_records(response):
+                        msg = self._ollama_message(line)
+                        if msg is None:
                             continue
-                        chunk = json.loads(line.decode("utf-8"))
-                        msg = chunk.get("message", {})
 
-                        # Handle tool calls
+                        # Handle tool calls: start them right away and keep draining the stream while they run
                         tool_calls = msg.get("tool_calls", [])
                         if tool_calls:
-                            tool_used = True
-                            loop_count += 1
-                            logger.debug(
-                                f"Tool call requested",
-                                extra={"agent_id": self.agent_id, "tool_calls": tool_calls}
-                            )
+                            if not tool_used:
+                                tool_used = True
+                                loop_count += 1
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug(
+                                    f"Tool call requested",
+                                    extra={"agent_id": self.agent_id, "tool_calls": tool_calls}
+                                )
 
                             for tool_call in tool_calls:
                                 fn = tool_call["function"]["name"]
                                 args = tool_call["function"].get("arguments", {}) or {}
+                                started_calls.append((tool_call, fn, args, start_tool(fn, args)))
+                            continue
 
-                                for tool in self.tools:
-                                    if tool.name == fn:
-                                        try:
-                                            result = tool.call(**args)
-                                        except Exception as ex:
-                                            result = f"Tool execution error: {ex}"
-                                            logger.error(
-                                                f"Tool {fn} failed: {ex}",
-                                                exc_info=True,
-                                                extra={"agent_id": self.agent_id, "tool_name": fn}
-                                            )
-                                        # Save assistant request + tool result
-                                        self.messages.append({
-                                            "role": "assistant",
-                                            "content": "",
-                                            "tool_calls": [tool_call]
-                                        })
-                                        self.messages.append({
-                                            "role": "tool",
-                                            "content": result
-                                        })
-                                        logger.info(
-                                            f"Tool {fn} executed",
-                                            extra={"agent_id": self.agent_id, "tool_name": fn, "result": result[:100]}
-                                        )
-                            break  # break streaming to start next loop turn
-
-                        # Handle natural content
+                        # Handle natural content (ignored once the model has asked for tools)
                         content = msg.get("content", "")
-                        if content:
-                            assistant_reply += content
+                        if content and not tool_used:
+                            assistant_reply_parts.append(content)
                             yield content
 
+                if started_calls:
+                    results: List[str] = []
+                    yield from self._finish_tools(
+                        [(fn, args) for _, fn, args, _ in started_calls],
+                        [future for *_, future in started_calls],
+                        results,
+                    )
+                    self._ollama_persist_tools(started_calls, results)
+
             except requests.RequestException as ex:
                 logger.error(f"Ollama API request failed: {ex}", exc_info=True, extra={"agent_id": self.agent_id})
                 yield f"\n[Error: Could not connect to Ollama: {ex}]"
                 return
 
             if not tool_used:
-                if assistant_reply:
-                    self.messages.append({"role": "assistant", "content": assistant_reply})
+                if assistant_reply_parts:
+                    self.messages.append({"role": "assistant", "content": "".join(assistant_reply_parts)})
+                break
+
+    async def _astream_ollama(self, client: "httpx.AsyncClient", max_tool_loops: int) -> AsyncIterator[str]:
+        import httpx
+
+        loop_count = 0
+        while True:
+            if loop_count >= max_tool_loops:
+                logger.warning("Max tool loop limit reached", extra={"agent_id": self.agent_id, "max_loops": max_tool_loops})
                 break
 
+            assistant_reply_parts: List[str] = []
+            tool_used = False
+            started_calls: List[Tuple[Dict[str, Any], str, Dict[str, Any], Optional[asyncio.Future]]] = []
+            start_tool = self._dedup_starts(self._astart_tool)
+
+            try:
+                async with client.stream("POST", OLLAMA_CHAT_URL, content=self._ollama_body(), headers=_JSON_HEADERS, timeout=120) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        logger.error(
+                            f"Ollama API error: {response.text}",
+                            extra={"agent_id": self.agent_id, "status_code": response.status_code}
+                        )
+                        return
+
+                    async for line in self._andjson_records(response):
+                        msg = self._ollama_message(line)
+                        if msg is None:
+                            continue
+
+                        tool_calls = msg.get("tool_calls", [])
+                        if tool_calls:
+                            if not tool_used:
+                                tool_used = True
+                                loop_count += 1
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug(
+                                    f"Tool call requested",
+                                    extra={"agent_id": self.agent_id, "tool_calls": tool_calls}
+                                )
+
+                            for tool_call in tool_calls:
+                                fn = tool_call["function"]["name"]
+                                args = tool_call["function"].get("arguments", {}) or {}
+                                started_calls.append((tool_call, fn, args, start_tool(fn, args)))
+                            continue
+
+                        content = msg.get("content", "")
+                        if content and not tool_used:
+                            assistant_reply_parts.append(content)
+                            yield content
+
+                if started_calls:
+                    results: List[str] = []
+                    async for progress in self._afinish_tools(
+                        [(fn, args) for _, fn, args, _ in started_calls],
+                        [task for *_, task in started_calls],
+                        results,
+                    ):
+                        yield progress
+                    self._ollama_persist_tools(started_calls, results)
+
+            except httpx.HTTPError as ex:
+                logger.error(f"Ollama API request failed: {ex}", exc_info=True, extra={"agent_id": self.agent_id})
+                yield f"\n[Error: Could not connect to Ollama: {ex}]"
+                return
+
+            if not tool_used:
+                if assistant_reply_parts:
+                    self.messages.append({"role": "assistant", "content": "".join(assistant_reply_parts)})
+                break
+
+    def _ollama_body(self) -> bytes:
+        # Serialize with orjson and send raw bytes, so the HTTP client doesn't re-encode with stdlib json.
+        # Only the history changes between tool loops; the tool schemas are pre-serialized.
+        return b"".join((
+            b'{"model":', orjson.dumps(self.model),
+            b',"messages":', self._history_bytes(),
+            b',"tools":', self._tools_schema_bytes,
+            b',"stream":true}',
+        ))
+
+    def _history_bytes(self) -> bytes:
+        """
+        self.messages as a JSON array. Messages are never edited once appended (trimming and
+        compaction only drop them), so each one is encoded once and reused by every later
+        request instead of re-serializing the whole history per tool loop.
+        """
+        previous = self._encoded_messages
+        encoded: Dict[int, Tuple[Dict[str, Any], bytes]] = {}
+        parts: List[bytes] = []
+        for message in self.messages:
+            entry = previous.get(id(message))
+            if entry is None or entry[0] is not message:
+                entry = (message, orjson.dumps(message))
+            encoded[id(message)] = entry
+            parts.append(entry[1])
+        # Rebuilt each time, so dropped messages are released with their bytes
+        self._encoded_messages = encoded
+        return b"[" + b",".join(parts) + b"]"
+
+    @staticmethod
+    def _ollama_message(line: bytes) -> Optional[Dict[str, Any]]:
+        """Return the "message" of an NDJSON record, or None for records with nothing to act on."""
+        # Metadata-only records (timings, done) carry empty content: skip them unparsed
+        if b'"content":""' in line and b'"tool_calls"' not in line:
+            return None
+        # orjson parses the raw bytes directly (no intermediate str)
+        return orjson.loads(line).get("message", {})
+
+    def _ollama_persist_tools(self, started_calls: List[Tuple[Dict[str, Any], str, Dict[str, Any], Any]], results: List[str]) -> None:
+        for (tool_call, fn, _, _), result in zip(started_calls, results):
+            # Save assistant request + tool result
+            self.messages.append({
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [tool_call]
+            })
+            self.messages.append({
+                "role": "tool",
+                "content": result
+            })
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Tool {fn} executed",
+                    extra={"agent_id": self.agent_id, "tool_name": fn, "result": result[:100]}
+                )
+
     # ---------- OpenAI streaming (Responses API only) ----------
 
     def _stream_openai(self, max_tool_loops: int) -> Iterable[str]:
-        model = self.model
+        import requests
+
         loop_count = 0
 
         while True:
@@ -229,25 +833,17 @@ class Agent:
                 logger.warning("Max tool loop limit reached", extra={"agent_id": self.agent_id, "max_loops": max_tool_loops})
                 break
 
-            assistant_text_parts: List[str] = []
-            # item_id -> {"name": str, "call_id": str, "args": [str], "args_json": str, "ready": bool}
-            pending_calls: Dict[str, Dict[str, Any]] = {}
+            # Text streamed this turn; written once per burst, read back once when the turn ends
+            assistant_text = io.StringIO()
+            pending_calls: Dict[str, _PendingCall] = {}
             # also keep a list of completed function_call items to append to history verbatim
             emitted_function_calls: List[dict] = []
-
-            body = {
-                "model": model,
-                "input": self.messages,            # persistent history (role'd messages + prior items)
-                "tools": self.tools_schema or [],
-                "tool_choice": "auto",
-                "parallel_tool_calls": True,
-                "stream": True,
-            }
+            start_tool = self._dedup_starts(self._start_tool)
 
             url = f"{OPENAI_API_BASE}/responses"
 
             try:
-                with requests.post(url, headers=self._openai_headers(), data=self._json(body), stream=True, timeout=30) as resp:
+                with self._http.post(url, headers=self._openai_headers(), data=self._openai_body(), stream=True, timeout=30) as resp:
                     if resp.status_code != 200:
                         try:
                             err = resp.json()
@@ -257,147 +853,98 @@ class Agent:
                         raise RuntimeError(f"OpenAI Responses API error: {err}")
 
                     # ---- SSE event loop ----
-                    for etype, data in self._sse_events(resp, debug=False):
-                        # 1) Streamed assistant text tokens
-                        if etype == "response.output_text.delta":
-                            delta = data.get("delta") or ""
+                    # Events are handled a socket read at a time; text deltas from the same read go
+                    # out as one chunk (fewer generator resumes and consumer writes, no added latency)
+                    for events in self._sse_events(resp, debug=False):
+                        burst: List[str] = []
+                        for etype, data in events:
+                            delta = self._openai_event(etype, data, pending_calls, emitted_function_calls, start_tool)
                             if delta:
-                                assistant_text_parts.append(delta)
-                                yield delta
-                            continue
+                                burst.append(delta)
+                        if burst:
+                            chunk = "".join(burst)
+                            assistant_text.write(chunk)
+                            yield chunk
 
-                        # 2) New function_call item — capture name & call_id
-                        if etype == "response.output_item.added":
-                            item = data.get("item") or {}
-                            if item.get("type") == "function_call":
-                                item_id = item.get("id")
-                                if item_id:
-                                    rec = pending_calls.setdefault(
-                                        item_id, {"name": "", "call_id": None, "args": [], "ready": False}
-                                    )
-                                    if item.get("name"):
-                                        rec["name"] = item["name"]
-                                    if item.get("call_id"):
-                                        rec["call_id"] = item["call_id"]
-                            continue
+                self._openai_persist_turn(assistant_text.getvalue(), emitted_function_calls)
 
-                        # 3) JSON args fragments (accumulate)
-                        if etype == "response.function_call_arguments.delta":
-                            item_id = data.get("item_id")
-                            frag = data.get("delta") or ""
-                            if item_id and frag:
-                                rec = pending_calls.setdefault(
-                                    item_id, {"name": "", "call_id": None, "args": [], "ready": False}
-                                )
-                                rec["args"].append(frag)
-                            continue
+                # ---- Execute tools and persist function_call_output items
+                if any(rec.ready for rec in pending_calls.values()):
+                    loop_count += 1
+                    ready_calls, call_ids, futures = self._openai_ready_calls(pending_calls, start_tool)
+                    # Wait for the tools, then persist outputs in call order
+                    results: List[str] = []
+                    yield from self._finish_tools(ready_calls, futures, results)
+                    self._openai_persist_outputs(call_ids, results)
 
-                        # 4) Args finished — mark ready and prepare a function_call item we can persist
-                        if etype == "response.function_call_arguments.done":
-                            item_id = data.get("item_id")
-                            if item_id and item_id in pending_calls:
-                                rec = pending_calls[item_id]
-                                args_json = "".join(rec["args"]) if rec["args"] else "{}"
-                                rec["args_json"] = args_json
-                                rec["ready"] = True
-                            continue
+                    # Kick off a fresh assistant turn with expanded history (includes function_call + outputs)
+                    # By design we do NOT set previous_response_id here, because history contains the calls.
+                    continue
 
-                        # 5) Item completed — second ready signal; build final function_call item
-                        if etype == "response.output_item.done":
-                            item = data.get("item") or {}
-                            if item.get("type") == "function_call":
-                                item_id = item.get("id")
-                                if item_id and item_id in pending_calls:
-                                    rec = pending_calls[item_id]
-                                    # ensure args_json
-                                    if not rec.get("args_json"):
-                                        rec["args_json"] = "".join(rec["args"]) if rec["args"] else "{}"
-                                    rec["ready"] = True
-                                    # create a function_call item that mirrors what Responses would return in .output
-                                    fn_name = rec.get("name") or item.get("name") or ""
-                                    call_id = rec.get("call_id") or item.get("call_id")
-                                    arguments = rec.get("args_json", "{}")
-                                    emitted_function_calls.append({
-                                        "id": item_id,
-                                        "type": "function_call",
-                                        "status": "completed",
-                                        "name": fn_name,
-                                        "call_id": call_id,
-                                        "arguments": arguments,
-                                    })
-                            continue
+            except requests.RequestException as ex:
+                logger.error(f"OpenAI API request failed: {ex}", exc_info=True, extra={"agent_id": self.agent_id})
+                yield f"\n[Error: Could not connect to OpenAI API: {ex}]"
+                return
+            except RuntimeError as ex:
+                logger.error(f"OpenAI API error: {ex}", exc_info=True, extra={"agent_id": self.agent_id})
+                yield f"\n[Error: {ex}]"
+                return
 
-                        # 6) Model-side error
-                        if etype == "response.error":
-                            err = data.get("error", "Unknown OpenAI streaming error")
-                            raise RuntimeError(str(err))
+            # ---- No tool calls this turn: finish
+            break
 
-                # ---- After streaming: persist streamed assistant text (if any)
-                if assistant_text_parts:
-                    self.messages.append({
-                        "role": "assistant",
-                        "content": [{"type": "output_text", "text": "".join(assistant_text_parts)}],
-                    })
-                    assistant_text_parts = []
+    async def _astream_openai(self, client: "httpx.AsyncClient", max_tool_loops: int) -> AsyncIterator[str]:
+        import httpx
 
-                # ---- Persist the function_call items into history (docs-style)
-                # (Now the tool calls live in input; no need for previous_response_id.)
-                if emitted_function_calls:
-                    self.messages += emitted_function_calls  # append list of dict items directly
+        loop_count = 0
 
-                # ---- Execute tools and persist function_call_output items
-                if any(rec.get("ready") for rec in pending_calls.values()):
-                    loop_count += 1
+        while True:
+            if loop_count >= max_tool_loops:
+                logger.warning("Max tool loop limit reached", extra={"agent_id": self.agent_id, "max_loops": max_tool_loops})
+                break
 
-                    for item_id, rec in pending_calls.items():
-                        if not rec.get("ready"):
-                            continue
+            # Text streamed this turn; written once per burst, read back once when the turn ends
+            assistant_text = io.StringIO()
+            pending_calls: Dict[str, _PendingCall] = {}
+            emitted_function_calls: List[dict] = []
+            start_tool = self._dedup_starts(self._astart_tool)
 
-                        fn_name = (rec.get("name") or "").strip()
-                        call_id = rec.get("call_id")
-                        if not fn_name or not call_id:
-                            logger.warning(
-                                f"Missing name/call_id for tool item, skipping",
-                                extra={"agent_id": self.agent_id, "item_id": item_id}
-                            )
-                            continue
+            url = f"{OPENAI_API_BASE}/responses"
 
-                        # Parse args JSON
-                        args_obj = self._parse_json_object(rec.get("args_json", "")) or {}
-
-                        # Execute your local tool
-                        tool_found = False
-                        result_payload = ""
-                        for tool in self.tools:
-                            if tool.name == fn_name:
-                                tool_found = True
-                                try:
-                                    result = tool.call(**args_obj)
-                                except Exception as ex:
-                                    result = f"Tool execution error: {ex}"
-                                    logger.error(
-                                        f"Tool {fn_name} failed: {ex}",
-                                        exc_info=True,
-                                        extra={"agent_id": self.agent_id, "tool_name": fn_name}
-                                    )
-                                # function_call_output.output expects a string
-                                result_payload = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
-                                break
-                        if not tool_found:
-                            result_payload = f"[Tool '{fn_name}' not found]"
-
-                        # Persist function_call_output item into history (docs example style)
-                        self.messages.append({
-                            "type": "function_call_output",
-                            "call_id": call_id,
-                            "output": result_payload,
-                        })
+            try:
+                async with client.stream("POST", url, headers=self._openai_headers(), content=self._openai_body(), timeout=30) as resp:
+                    if resp.status_code != 200:
+                        await resp.aread()
+                        try:
+                            err = resp.json()
+                        except Exception:
+                            err = {"error": resp.text}
+                        logger.error(f"OpenAI API error: {err}", extra={"agent_id": self.agent_id})
+                        raise RuntimeError(f"OpenAI Responses API error: {err}")
 
-                    # Kick off a fresh assistant turn with expanded history (includes function_call + outputs)
-                    # By design we do NOT set previous_response_id here, because history contains the calls.
+                    async for events in self._asse_events(resp):
+                        burst: List[str] = []
+                        for etype, data in events:
+                            delta = self._openai_event(etype, data, pending_calls, emitted_function_calls, start_tool)
+                            if delta:
+                                burst.append(delta)
+                        if burst:
+                            chunk = "".join(burst)
+                            assistant_text.write(chunk)
+                            yield chunk
+
+                self._openai_persist_turn(assistant_text.getvalue(), emitted_function_calls)
+
+                if any(rec.ready for rec in pending_calls.values()):
+                    loop_count += 1
+                    ready_calls, call_ids, tasks = self._openai_ready_calls(pending_calls, start_tool)
+                    results: List[str] = []
+                    async for progress in self._afinish_tools(ready_calls, tasks, results):
+                        yield progress
+                    self._openai_persist_outputs(call_ids, results)
                     continue
 
-            except requests.RequestException as ex:
+            except httpx.HTTPError as ex:
                 logger.error(f"OpenAI API request failed: {ex}", exc_info=True, extra={"agent_id": self.agent_id})
                 yield f"\n[Error: Could not connect to OpenAI API: {ex}]"
                 return
@@ -406,18 +953,348 @@ class Agent:
                 yield f"\n[Error: {ex}]"
                 return
 
-            # ---- No tool calls this turn: finish
             break
 
-    # ---------- Utilities ----------
+    def _openai_body(self) -> bytes:
+        # Same splice as _ollama_body: only the history is serialized per request; the tool
+        # schemas and the constant options are bytes that never change for this agent
+        return b"".join((
+            b'{"model":', orjson.dumps(self.model),
+            b',"input":', self._history_bytes(),  # persistent history (role'd messages + prior items)
+            b',"tools":', self._tools_schema_bytes,
+            self._openai_body_tail,
+        ))
+
+    def _openai_event(
+        self,
+        etype: Optional[str],
+        data: Dict[str, Any],
+        pending_calls: Dict[str, _PendingCall],
+        emitted_function_calls: List[dict],
+        start_tool: Callable[[str, ToolArgs], Any],
+    ) -> Optional[str]:
+        """
+        Apply one Responses API stream event to the turn state. Returns the text delta to
+        stream to the caller, if any. `start_tool` launches a completed call (sync or async path).
+        """
+        # 1) Streamed assistant text tokens
+        if etype == "response.output_text.delta":
+            return data.get("delta") or None
+
+        # 2) New function_call item — capture name & call_id
+        if etype == "response.output_item.added":
+            item = data.get("item") or {}
+            if item.get("type") == "function_call":
+                item_id = item.get("id")
+                if item_id:
+                    rec = pending_calls.get(item_id)
+                    if rec is None:
+                        rec = pending_calls[item_id] = _PendingCall()
+                    if item.get("name"):
+                        rec.name = item["name"]
+                    if item.get("call_id"):
+                        rec.call_id = item["call_id"]
+            return None
+
+        # 3) JSON args fragments (accumulate)
+        if etype == "response.function_call_arguments.delta":
+            item_id = data.get("item_id")
+            frag = data.get("delta") or ""
+            if item_id and frag:
+                rec = pending_calls.get(item_id)
+                if rec is None:
+                    rec = pending_calls[item_id] = _PendingCall()
+                rec.args.append(frag)
+            return None
+
+        # 4) Args finished — mark ready and prepare a function_call item we can persist
+        if etype == "response.function_call_arguments.done":
+            item_id = data.get("item_id")
+            rec = pending_calls.get(item_id) if item_id else None
+            if rec is not None:
+                # The done event carries the full argument string; only join fragments as a fallback
+                rec.args_json = data.get("arguments") or "".join(rec.args) or "{}"
+                rec.args = []
+                rec.ready = True
+            return None
+
+        # 5) Item completed — second ready signal; build final function_call item
+        if etype == "response.output_item.done":
+            item = data.get("item") or {}
+            if item.get("type") == "function_call":
+                item_id = item.get("id")
+                rec = pending_calls.get(item_id) if item_id else None
+                if rec is not None:
+                    # ensure args_json
+                    if not rec.args_json:
+                        rec.args_json = item.get("arguments") or "".join(rec.args) or "{}"
+                    rec.ready = True
+                    # create a function_call item that mirrors what Responses would return in .output
+                    fn_name = rec.name or item.get("name") or ""
+                    call_id = rec.call_id or item.get("call_id")
+                    arguments = rec.args_json
+                    rec.name, rec.call_id = fn_name, call_id
+                    # The call is complete: start the tool now so it runs while the rest of the stream is read
+                    # (arguments stay raw JSON here; they are parsed on the tool's worker)
+                    if fn_name.strip() and call_id:
+                        rec.handle = start_tool(fn_name.strip(), arguments)
+                        rec.started = True
+                    emitted_function_calls.append({
+                        "id": item_id,
+                        "type": "function_call",
+                        "status": "completed",
+                        "name": fn_name,
+                        "call_id": call_id,
+                        "arguments": arguments,
+                    })
+            return None
+
+        # 6) Model-side error
+        if etype == "response.error":
+            err = data.get("error", "Unknown OpenAI streaming error")
+            raise RuntimeError(str(err))
+
+        return None
+
+    def _openai_persist_turn(self, assistant_text: str, emitted_function_calls: List[dict]) -> None:
+        # ---- After streaming: persist streamed assistant text (if any)
+        if assistant_text:
+            self.messages.append({
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": assistant_text}],
+            })
+
+        # ---- Persist the function_call items into history (docs-style)
+        # (Now the tool calls live in input; no need for previous_response_id.)
+        if emitted_function_calls:
+            self.messages += emitted_function_calls  # append list of dict items directly
+
+    def _openai_ready_calls(
+        self,
+        pending_calls: Dict[str, _PendingCall],
+        start_tool: Callable[[str, ToolArgs], Any],
+    ) -> Tuple[List[Tuple[str, ToolArgs]], List[str], List[Any]]:
+        """Collect the turn's completed calls as (calls, call_ids, handles), starting any not yet running."""
+        ready_calls: List[Tuple[str, ToolArgs]] = []
+        call_ids: List[str] = []
+        handles: List[Any] = []
+        for item_id, rec in pending_calls.items():
+            if not rec.ready:
+                continue
+
+            fn_name = rec.name.strip()
+            call_id = rec.call_id
+            if not fn_name or not call_id:
+                logger.warning(
+                    f"Missing name/call_id for tool item, skipping",
+                    extra={"agent_id": self.agent_id, "item_id": item_id}
+                )
+                continue
+
+            arguments = rec.args_json
+            if rec.started:
+                # Already started when its output item completed mid-stream
+                handle = rec.handle
+            else:
+                handle = start_tool(fn_name, arguments)
+            ready_calls.append((fn_name, arguments))
+            call_ids.append(call_id)
+            handles.append(handle)
+        return ready_calls, call_ids, handles
+
+    def _openai_persist_outputs(self, call_ids: List[str], results: List[str]) -> None:
+        for call_id, result_payload in zip(call_ids, results):
+            # Persist function_call_output item into history (docs example style)
+            self.messages.append({
+                "type": "function_call_output",
+                "call_id": call_id,
+                "output": result_payload,
+            })
+
+    # ---------- Tool execution ----------
+
+    def _run_tool(self, fn_name: str, args: ToolArgs) -> str:
+        """Execute a single tool call, returning its result (or error) as a string."""
+        tool = self._tools_by_name.get(fn_name)
+        if tool is None:
+            logger.warning(f"Model requested unknown tool {fn_name}", extra={"agent_id": self.agent_id, "tool_name": fn_name})
+            return f"[Tool '{fn_name}' not found]"
+        if isinstance(args, str):
+            try:
+                args = self._parse_json_object(args)
+            except ValueError as ex:
+                return self._tool_args_error(fn_name, args, ex)
+        try:
+            if asyncio.iscoroutinefunction(tool.call):
+                # Runs on a worker thread, so there is no event loop to collide with
+                result = asyncio.run(tool.call(**args))
+            else:
+                result = tool.call(**args)
+        except Exception as ex:
+            result = self._tool_error(fn_name, ex)
+        return self._tool_output(result)
+
+    async def _arun_tool(self, fn_name: str, args: ToolArgs) -> str:
+        """Async counterpart of _run_tool: goes through Tool.acall, so tools with async I/O stay on the loop."""
+        tool = self._tools_by_name.get(fn_name)
+        if tool is None:
+            return self._run_tool(fn_name, args)
+        if isinstance(args, str):
+            try:
+                args = self._parse_json_object(args)
+            except ValueError as ex:
+                return self._tool_args_error(fn_name, args, ex)
+        try:
+            result = await tool.acall(**args)
+        except Exception as ex:
+            result = self._tool_error(fn_name, ex)
+        return self._tool_output(result)
+
+    def _tool_error(self, fn_name: str, ex: Exception) -> str:
+        logger.error(
+            f"Tool {fn_name} failed: {ex}",
+            exc_info=True,
+            extra={"agent_id": self.agent_id, "tool_name": fn_name}
+        )
+        return f"Tool execution error: {ex}"
+
+    def _tool_args_error(self, fn_name: str, raw: str, ex: ValueError) -> str:
+        # Report malformed arguments back to the model instead of calling the tool with {}
+        logger.warning(
+            f"Invalid arguments for tool {fn_name}: {ex}",
+            extra={"agent_id": self.agent_id, "tool_name": fn_name, "arguments": raw[:200]}
+        )
+        return f"Tool argument error: {ex}"
+
+    @staticmethod
+    def _tool_output(result: Any) -> str:
+        # Tool results are sent back to the model as strings
+        return result if isinstance(result, str) else orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def _start_tool(self, fn_name: str, args: ToolArgs) -> Optional[Future]:
+        """
+        Start a tool call on the shared pool so a slow tool never blocks reading the model stream.
+        Returns None for `sequential` tools, which run in order when the results are collected.
+        """
+        tool = self._tools_by_name.get(fn_name)
+        if tool is not None and tool.sequential:
+            return None
+        return _TOOL_POOL.submit(self._run_tool, fn_name, args)
+
+    def _astart_tool(self, fn_name: str, args: ToolArgs) -> Optional[asyncio.Future]:
+        """Async counterpart of _start_tool: schedules the call as a task on the running loop."""
+        tool = self._tools_by_name.get(fn_name)
+        if tool is not None and tool.sequential:
+            return None
+        return asyncio.ensure_future(self._arun_tool(fn_name, args))
+
+    def _dedup_starts(self, start_tool: Callable[[str, ToolArgs], Any]) -> Callable[[str, ToolArgs], Any]:
+        """
+        Wrap start_tool for one turn so repeated calls with the same name and arguments share
+        a single run (models sometimes emit the same lookup twice). Sequential tools may
+        mutate state, so they are never merged.
+        """
+        started: Dict[Tuple[str, bytes], Any] = {}
+
+        def start(fn_name: str, args: ToolArgs) -> Any:
+            key = (fn_name, self._args_key(args))
+            if key in started:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"Reusing result of identical {fn_name} call",
+                        extra={"agent_id": self.agent_id, "tool_name": fn_name}
+                    )
+                return started[key]
+            handle = start_tool(fn_name, args)
+            if handle is not None:
+                started[key] = handle
+            return handle
+
+        return start
 
     @staticmethod
-    def _parse_json_object(s: str) -> Any:
-        """Parse function-call arguments JSON into a Python object safely."""
+    def _args_key(args: ToolArgs) -> bytes:
+        # Canonical form: '{"a":1,"b":2}' and '{"b": 2, "a": 1}' are the same call
         try:
-            return json.loads(s) if s else {}
-        except Exception:
+            obj = orjson.loads(args) if isinstance(args, str) else args
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except (ValueError, TypeError):
+            return args.encode() if isinstance(args, str) else repr(args).encode()
+
+    def _finish_tools(
+        self, calls: List[Tuple[str, ToolArgs]], futures: List[Optional[Future]], results: List[str]
+    ) -> Iterable[str]:
+        """
+        Collect the results of a turn's tool calls into `results`, in call order. Tools started
+        with _start_tool run concurrently, so N calls take max(t_i) instead of sum(t_i).
+        With tool_progress, yields a progress line as each call completes.
+        """
+        results[:] = [""] * len(calls)
+
+        # Sequential tools run on this thread while the parallel ones are in flight
+        for i, future in enumerate(futures):
+            if future is None:
+                results[i] = self._run_tool(*calls[i])
+                if self.tool_progress:
+                    yield self._progress_line(calls[i][0])
+
+        # Deduplicated calls share a future: one completion fills every index that uses it
+        waiting: Dict[Future, List[int]] = {}
+        for i, future in enumerate(futures):
+            if future is not None:
+                waiting.setdefault(future, []).append(i)
+        for future in as_completed(waiting) if self.tool_progress else waiting:
+            for i in waiting[future]:
+                results[i] = future.result()
+            if self.tool_progress:
+                yield self._progress_line(calls[waiting[future][0]][0])
+
+    async def _afinish_tools(
+        self, calls: List[Tuple[str, ToolArgs]], tasks: List[Optional[asyncio.Future]], results: List[str]
+    ) -> AsyncIterator[str]:
+        """Async counterpart of _finish_tools."""
+        results[:] = [""] * len(calls)
+
+        for i, task in enumerate(tasks):
+            if task is None:
+                results[i] = await self._arun_tool(*calls[i])
+                if self.tool_progress:
+                    yield self._progress_line(calls[i][0])
+
+        waiting: Dict[asyncio.Future, List[int]] = {}
+        for i, task in enumerate(tasks):
+            if task is not None:
+                waiting.setdefault(task, []).append(i)
+        if not self.tool_progress:
+            for task, indices in waiting.items():
+                result = await task
+                for i in indices:
+                    results[i] = result
+            return
+
+        pending = set(waiting)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for i in waiting[task]:
+                    results[i] = task.result()
+                yield self._progress_line(calls[waiting[task][0]][0])
+
+    @staticmethod
+    def _progress_line(fn_name: str) -> str:
+        return f"\n[{fn_name} done]\n"
+
+    # ---------- Utilities ----------
+
+    @staticmethod
+    def _parse_json_object(s: str) -> Dict[str, Any]:
+        """Parse function-call arguments JSON into a dict. Raises ValueError if it isn't a JSON object."""
+        if not s:
             return {}
+        args = orjson.loads(s)  # orjson.JSONDecodeError is a ValueError
+        if not isinstance(args, dict):
+            raise ValueError(f"expected a JSON object, got {type(args).__name__}")
+        return args
         
     @staticmethod
     def _openai_headers() -> Dict[str, str]:
@@ -430,59 +1307,91 @@ class Agent:
         }
 
     @staticmethod
-    def _sse_events(response: requests.Response, *, debug: bool = False):
+    def _socket_chunks(response: "requests.Response") -> Iterable[bytes]:
         """
-        Robust SSE parser for OpenAI Responses API.
-        Flushes on blank lines, handles multi-line JSON, ignores comments.
+        Yield body bytes as soon as the socket has them (up to _READ_SIZE per read), so a
+        token is never held back waiting for a fixed-size read buffer to fill. Bytes are
+        decoded per Content-Encoding, as iter_content would (requests sends Accept-Encoding).
         """
-        event = None
-        data_lines = []
-
-        def flush():
-            nonlocal event, data_lines
-            if not data_lines:
-                return
-            payload = "\n".join(data_lines)
-            data_lines = []
-            if payload.strip() == "[DONE]":
-                raise StopIteration
-            try:
-                data = json.loads(payload)
-            except Exception:
-                data = {"raw": payload}
-            yield (event, data)
-            event = None
-
-        for raw in response.iter_lines(chunk_size=8192, decode_unicode=True):
-            if raw is None:
-                continue
-            if debug:
-                logger.debug(f"SSE raw line: {raw}")
-
-            line = raw.lstrip("\ufeff")
-            if not line:
-                yield from flush()
-                continue
+        read1 = getattr(response.raw, "read1", None)
+        if read1 is None:  # urllib3 < 2
+            yield from response.iter_content(chunk_size=None)
+            return
+        while True:
+            data = read1(_READ_SIZE, decode_content=True)
+            if not data:
+                break
+            yield data
 
-            if line.startswith(":"):
-                continue  # comment/heartbeat
-            if line.startswith("event:"):
-                event = line.split(":", 1)[1].strip() or None
-                continue
-            if line.startswith("data:"):
-                data_lines.append(line.split(":", 1)[1].strip())
-                continue
+    @staticmethod
+    def _ndjson_records(response: "requests.Response") -> Iterable[bytes]:
+        """Frame an NDJSON stream into raw record bytes as soon as each newline arrives."""
+        framer = _LineFramer()
+        for data in Agent._socket_chunks(response):
+            yield from framer.feed(data)
+        yield from framer.tail()
 
-            # Fallback (treat unknown fields as data continuation)
-            data_lines.append(line.strip())
+    @staticmethod
+    async def _andjson_records(response: "httpx.Response") -> AsyncIterator[bytes]:
+        framer = _LineFramer()
+        async for data in response.aiter_bytes():
+            if data:
+                for record in framer.feed(data):
+                    yield record
+        for record in framer.tail():
+            yield record
 
-        yield from flush()
+    @staticmethod
+    def _sse_events(response: "requests.Response", *, debug: bool = False) -> Iterable[List[Tuple[Optional[str], Any]]]:
+        """
+        Robust SSE parser for OpenAI Responses API.
+        Flushes on blank lines, handles multi-line JSON, ignores comments.
+        Yields the events completed by each socket read as one list.
+        """
+        parser = _SSEParser()
+        framer = _LineFramer(keep_blank=True)
+        for data in Agent._socket_chunks(response):
+            events = []
+            for line in framer.feed(data):
+                if debug:
+                    logger.debug(f"SSE raw line: {line!r}")
+
+                event = parser.feed(line)
+                if parser.done:
+                    break
+                if event is not None:
+                    events.append(event)
+            if events:
+                yield events
+            if parser.done:
+                return
 
+        for line in framer.tail():
+            parser.feed(line)
+        event = parser.flush()
+        if event is not None and not parser.done:
+            yield [event]
 
     @staticmethod
-    def _json(obj) -> str:
-        try:
-            return json.dumps(obj)
-        except Exception:
-            return "{}"
+    async def _asse_events(response: "httpx.Response") -> AsyncIterator[List[Tuple[Optional[str], Any]]]:
+        parser = _SSEParser()
+        framer = _LineFramer(keep_blank=True)
+        async for data in response.aiter_bytes():
+            events = []
+            for line in framer.feed(data):
+                event = parser.feed(line)
+                if parser.done:
+                    break
+                if event is not None:
+                    events.append(event)
+            if events:
+                yield events
+            if parser.done:
+                return
+
+        for line in framer.tail():
+            parser.feed(line)
+        event = parser.flush()
+        if event is not None and not parser.done:
+            yield [event]
         
@@ -0,0 +1,149 @@
+import os
+import re
+import asyncio
+import time
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import orjson
+
+from smart_home.config.env import load_env
+
+load_env()
+
+T = TypeVar("T")
+
+# How long agent system-prompt context (device lists, temperature) is reused across agents
+AGENT_PROMPT_CACHE_TTL = float(os.getenv("AGENT_PROMPT_CACHE_TTL", "60"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Politeness/filler words that don't change what is being asked
+_FILLER_WORDS = frozenset({"please", "hey", "hi", "ok", "okay", "so", "um", "uh", "just", "thanks"})
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Reduce a prompt to its content words: lowercase, punctuation and filler words dropped."""
+    # Apostrophes are dropped first so "what's" and "whats" match
+    words = _WORD_RE.findall(prompt.lower().replace("'", "").replace("\u2019", ""))
+    return " ".join(w for w in words if w not in _FILLER_WORDS)
+
+
+class ResponseCache:
+    """
+    Bounded, in-process prompt -> response cache for Agent.stream.
+
+    Entries are keyed on a hash of the full request (model, message history, tool schemas),
+    so a hit only happens when the model would see byte-identical input. Only plain text
+    turns are stored; turns that called tools are never replayed, since tool results
+    (device state, weather, playback) can change between calls.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (stored_at, reply_text, assistant_message)
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], tools_schema: List[Dict[str, Any]]) -> str:
+        """Content-address a request by hashing its serialized model, history and tools."""
+        blob = orjson.dumps({"m": model, "msgs": messages, "tools": tools_schema})
+        return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+    @staticmethod
+    def make_loose_key(
+        model: str,
+        system_prompt: str,
+        tools_schema: List[Dict[str, Any]],
+        context: Optional[Dict[str, Any]],
+        prompt: str,
+    ) -> str:
+        """
+        Key for the paraphrase tier: the agent's static setup, the message being replied to
+        and the normalized prompt. "What's the weather?" and "what's the weather, please"
+        share a key; the same words after a different reply don't.
+        """
+        blob = orjson.dumps({
+            "m": model,
+            "sys": system_prompt,
+            "tools": tools_schema,
+            "ctx": context,
+            "p": normalize_prompt(prompt),
+        })
+        return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (reply_text, assistant_message) for a fresh entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, text, message = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return text, message
+
+    def put(self, key: str, text: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), text, message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def ttl_cache(seconds: float) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Memoize a function's return value per argument tuple for `seconds` (0 disables caching).
+    Exceptions are not cached, so a failed lookup is retried on the next call.
+    Coroutine functions are supported: the awaited result is what gets cached.
+    """
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        entries: Dict[Tuple[Any, ...], Tuple[float, T]] = {}
+        lock = threading.Lock()
+
+        def lookup(key: Tuple[Any, ...]) -> Optional[Tuple[float, T]]:
+            with lock:
+                entry = entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < seconds:
+                return entry
+            return None
+
+        def store(key: Tuple[Any, ...], value: T) -> None:
+            with lock:
+                entries[key] = (time.monotonic(), value)
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                if seconds <= 0:
+                    return await fn(*args, **kwargs)
+                key = (args, tuple(sorted(kwargs.items())))
+                entry = lookup(key)
+                if entry is not None:
+                    return entry[1]
+                value = await fn(*args, **kwargs)
+                store(key, value)
+                return value
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                if seconds <= 0:
+                    return fn(*args, **kwargs)
+                key = (args, tuple(sorted(kwargs.items())))
+                entry = lookup(key)
+                if entry is not None:
+                    return entry[1]
+                value = fn(*args, **kwargs)
+                store(key, value)
+                return value
+
+        wrapper.cache_clear = entries.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -0,0 +1,20 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Tuple
+
+# One pool for the blocking I/O agents do while being built (device lists, temperature,
+# MCP discovery), shared by every agent instead of each spinning up its own threads
+AGENT_IO_POOL = ThreadPoolExecutor(
+    max_workers=min(16, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="agent-io",
+)
+
+
+def gather_blocking(*callables: Callable[[], Any]) -> Tuple[Any, ...]:
+    """
+    Run zero-argument callables concurrently on AGENT_IO_POOL and return their results
+    in the order given. Total time is the slowest call, not the sum. The first exception
+    (in argument order) is re-raised once every call has been submitted.
+    """
+    futures = [AGENT_IO_POOL.submit(fn) for fn in callables]
+    return tuple(future.result() for future in futures)
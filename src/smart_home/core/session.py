@@ -1,21 +1,79 @@
-import json
+import os
+import queue
+import orjson
+import atexit
 import logging
-import random
-import string
+import secrets
+import threading
 from datetime import datetime
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from smart_home.config.paths import SESSIONS_DIR
+from smart_home.config.env import load_env
 
 if TYPE_CHECKING:
     from smart_home.core.agent import Agent
 
+load_env()
+
 logger = logging.getLogger(__name__)
 
+# Session files are read by tooling, not people: compact JSON unless SMART_HOME_PRETTY_LOGS is set
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | (
+    orjson.OPT_INDENT_2 if os.getenv("SMART_HOME_PRETTY_LOGS", "False").lower() in ("true", "1", "yes") else 0
+)
+
 
 def _generate_session_id(length: int = 8) -> str:
-    """Generate a random session ID using alphanumeric characters."""
-    characters = string.ascii_lowercase + string.digits
-    return ''.join(random.choices(characters, k=length))
+    """Generate a random session ID of `length` lowercase hex characters."""
+    return secrets.token_hex((length + 1) // 2)[:length]
+
+
+# Background writer for Session.save_async(): one daemon thread drains (session, snapshot) pairs
+_SAVE_QUEUE: "queue.Queue[tuple[Session, Dict[str, Any]]]" = queue.Queue()
+_SAVE_THREAD: Optional[threading.Thread] = None
+_SAVE_THREAD_LOCK = threading.Lock()
+
+
+def _save_worker() -> None:
+    while True:
+        # Coalesce: snapshots queued while the last write ran are collapsed to the newest
+        # one per session, so a burst of turns costs one write
+        latest: Dict[int, tuple[Session, Dict[str, Any]]] = {}
+        taken = 0
+        session, session_data = _SAVE_QUEUE.get()
+        while True:
+            latest[id(session)] = (session, session_data)
+            taken += 1
+            try:
+                session, session_data = _SAVE_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            for session, session_data in latest.values():
+                try:
+                    session._write(session_data)
+                except Exception as e:
+                    # Reported to the caller by its next save_async(); the worker keeps running
+                    # so later saves (and the exit-time join) aren't stuck behind it
+                    session._save_error = e
+                    logger.error(
+                        f"Failed to save session {session.session_id}: {e}",
+                        exc_info=True,
+                        extra={"session_id": session.session_id}
+                    )
+        finally:
+            for _ in range(taken):
+                _SAVE_QUEUE.task_done()
+
+
+def _ensure_save_thread() -> None:
+    global _SAVE_THREAD
+    with _SAVE_THREAD_LOCK:
+        if _SAVE_THREAD is None:
+            _SAVE_THREAD = threading.Thread(target=_save_worker, name="session-saver", daemon=True)
+            _SAVE_THREAD.start()
+            # Don't lose the last turn on exit: wait for queued writes to land
+            atexit.register(_SAVE_QUEUE.join)
 
 
 class Session:
@@ -35,13 +93,20 @@ class Session:
     def __init__(self, metadata: Optional[Dict[str, Any]] = None):
         self.session_id: str = _generate_session_id()
         self.created_at: datetime = datetime.now()
+        # Formatted once: every save and log line reuses it
+        self._created_at_iso: str = self.created_at.isoformat()
         self.primary_agent: Optional['Agent'] = None
         self.subagents: Dict[str, 'Agent'] = {}  # Track all sub-agents by agent_id
         self.metadata: Dict[str, Any] = metadata or {}
+        # Last bytes written to disk, so an unchanged snapshot isn't rewritten (see _write)
+        self._saved_payload: Optional[bytes] = None
+        self._write_lock = threading.Lock()
+        # Error from the last background save, raised by the next save_async()
+        self._save_error: Optional[Exception] = None
 
         logger.info(
             f"Created session {self.session_id}",
-            extra={"session_id": self.session_id, "created_at": self.created_at.isoformat()}
+            extra={"session_id": self.session_id, "created_at": self._created_at_iso}
         )
 
     def set_primary_agent(self, agent: 'Agent') -> None:
@@ -124,15 +189,16 @@ class Session:
         message = {"role": role, "content": content}
         self.primary_agent.messages.append(message)
 
-        logger.debug(
-            f"Injected message into primary agent's history",
-            extra={
-                "session_id": self.session_id,
-                "agent_id": self.primary_agent.agent_id,
-                "role": role,
-                "content_preview": content[:100],
-            }
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Injected message into primary agent's history",
+                extra={
+                    "session_id": self.session_id,
+                    "agent_id": self.primary_agent.agent_id,
+                    "role": role,
+                    "content_preview": content[:100],
+                }
+            )
 
     def get_primary_messages(self) -> List[Dict[str, Any]]:
         """
@@ -154,20 +220,20 @@ class Session:
         """
         return {
             "session_id": self.session_id,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self._created_at_iso,
             "primary_agent": {
                 "agent_id": self.primary_agent.agent_id if self.primary_agent else None,
                 "agent_type": self.primary_agent.agent_type if self.primary_agent else None,
                 "model": self.primary_agent.model if self.primary_agent else None,
                 "provider": self.primary_agent.provider if self.primary_agent else None,
-                "messages": self.primary_agent.messages if self.primary_agent else [],
+                "messages": list(self.primary_agent.messages) if self.primary_agent else [],
             },
             "subagents": {
                 agent_id: {
                     "agent_type": agent.agent_type,
                     "model": agent.model,
                     "provider": agent.provider,
-                    "messages": agent.messages,
+                    "messages": list(agent.messages),
                 }
                 for agent_id, agent in self.subagents.items()
             },
@@ -183,31 +249,62 @@ class Session:
         - Primary agent's complete message history
         - All sub-agents' message histories
         - Conversation flow and tool usage
+
+        Raises:
+            OSError: If the file can't be written (the previous save stays intact)
         """
-        try:
-            # Create session file path
-            session_file = SESSIONS_DIR / f"{self.session_id}.json"
+        self._write(self.to_dict())
 
-            # Serialize session state
-            session_data = self.to_dict()
+    def save_async(self) -> None:
+        """
+        Same as save(), but the file is written on a background thread.
 
-            # Write to file
-            with open(session_file, "w", encoding="utf-8") as f:
-                json.dump(session_data, f, ensure_ascii=False, indent=2)
+        The session state is snapshotted on the calling thread, so the agents can keep
+        appending messages while the previous turn is being written.
 
+        Raises:
+            Exception: The error of a previous background save that failed (e.g. OSError
+                       for a full disk). This snapshot is still queued.
+        """
+        error, self._save_error = self._save_error, None
+        _ensure_save_thread()
+        _SAVE_QUEUE.put((self, self.to_dict()))
+        if error is not None:
+            raise error
+
+    def _write(self, session_data: Dict[str, Any]) -> None:
+        """Write a session snapshot to disk. Raises OSError if the write fails."""
+        # Create session file path
+        session_file = SESSIONS_DIR / f"{self.session_id}.json"
+
+        # orjson emits UTF-8 bytes directly
+        payload = orjson.dumps(session_data, option=_JSON_OPTIONS)
+
+        with self._write_lock:
+            if payload == self._saved_payload:
+                return  # nothing changed since the last save (e.g. an ignored input)
+            # Write beside the target and rename over it, so readers never see a half-written file
+            tmp_file = session_file.with_suffix(".json.tmp")
+            try:
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_file, session_file)
+            except OSError:
+                # The previous save is still in place; don't leave the partial file beside it
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                raise
+            self._saved_payload = payload
+
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 f"Saved session {self.session_id}",
                 extra={
                     "session_id": self.session_id,
                     "session_file": str(session_file),
-                    "message_count": len(self.primary_agent.messages) if self.primary_agent else 0,
-                    "subagent_count": len(self.subagents)
+                    "message_count": len(session_data["primary_agent"]["messages"]),
+                    "subagent_count": len(session_data["subagents"])
                 }
             )
-
-        except Exception as e:
-            logger.error(
-                f"Failed to save session {self.session_id}: {e}",
-                exc_info=True,
-                extra={"session_id": self.session_id}
-            )
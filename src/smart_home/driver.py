@@ -1,45 +1,86 @@
-from smart_home.utils.voice_utils import streaming_tts, speech_to_text  # , wait_for_wake_word
-from smart_home.agents.weather import WeatherAgent
-from smart_home.agents.spotify import SpotifyAgent
-from smart_home.agents.home import HomeAgent
-from smart_home.agents.search import SearchAgent
-from smart_home.agents.zigbee import ZigbeeAgent
 from smart_home.core.agent import Agent
 from smart_home.core.session import Session
 import os
+import sys
+import time
 import logging
-from dotenv import load_dotenv
+import functools
+import importlib
 from smart_home.config import logging as logging_config
+from smart_home.config.env import load_env
 # from smart_home.config.paths import MODELS_DIR  # Unused while wake word is disabled
 
-load_dotenv(override=True)
+load_env()
 
 # Initialize logging system
 logging_config.configure()
 logger = logging.getLogger(__name__)
 
+# Agents are imported when picked, so startup only pays for the one in use
+# (their modules pull in MCP, Spotify, Zigbee and weather tooling)
 NAME_TO_AGENT = {
-    "weather": WeatherAgent,
-    "spotify": SpotifyAgent,
-    "home": HomeAgent,
-    "search": SearchAgent,
-    "zigbee": ZigbeeAgent,
+    "weather": "smart_home.agents.weather:WeatherAgent",
+    "spotify": "smart_home.agents.spotify:SpotifyAgent",
+    "home": "smart_home.agents.home:HomeAgent",
+    "search": "smart_home.agents.search:SearchAgent",
+    "zigbee": "smart_home.agents.zigbee:ZigbeeAgent",
 }
 
+
+@functools.lru_cache(maxsize=None)
+def _load_agent_class(path: str) -> type[Agent]:
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 def select_agent_by_name(name: str, session: Session = None) -> Agent|None:
-    agent_class = NAME_TO_AGENT.get(name.lower())
-    if agent_class:
-        return agent_class(session=session)
+    path = NAME_TO_AGENT.get(name.lower())
+    if path:
+        return _load_agent_class(path)(session=session)
     return None
 
 
-def converse_with_agent(Agent: Agent | None = None, session: Session | None = None):
+# Console echo flushes at most this often (seconds) instead of once per chunk
+_ECHO_FLUSH_INTERVAL = 0.05
+
+
+def _echo_stream(agent: Agent, user_input: str):
+    """Stream the agent's reply to the console, passing each chunk on (e.g. to TTS)."""
+    write, flush = sys.stdout.write, sys.stdout.flush
+    last_flush = time.monotonic()
+    try:
+        for chunk in agent.stream(user_input):
+            write(chunk)
+            now = time.monotonic()
+            if now - last_flush >= _ECHO_FLUSH_INTERVAL:
+                flush()
+                last_flush = now
+            yield chunk
+    finally:
+        flush()
+
+
+def _echo(agent: Agent, user_input: str) -> None:
+    """Text-only turn: print the reply as it streams, nothing else consumes it."""
+    for _ in _echo_stream(agent, user_input):
+        pass
+
+
+def converse_with_agent(agent: Agent | None = None, session: Session | None = None, **legacy):
+    # The parameter used to be called `Agent` (which shadowed the class); callers passing
+    # it by that keyword keep working
+    if "Agent" in legacy:
+        legacy_agent = legacy.pop("Agent")
+        if agent is None:
+            agent = legacy_agent
+    if legacy:
+        raise TypeError(f"converse_with_agent() got unexpected keyword arguments: {', '.join(legacy)}")
+
     # Create session if not provided
     if session is None:
         session = Session()
 
-    if Agent is not None:
-        agent = Agent
+    if agent is not None:
         # Agent already has session from main(), just verify it's set
         if agent.session is None:
             agent.session = session
@@ -75,10 +116,21 @@ def converse_with_agent(Agent: Agent | None = None, session: Session | None = No
     # --------------------------------------------------------------------
 
     wakeword = os.getenv("WAKEWORD", "").lower()
+    use_stt = os.getenv("SPEECH_TO_TEXT", "False").lower() == "true"
+    use_tts = os.getenv("TEXT_TO_SPEECH", "False").lower() == "true"
+    if use_stt or use_tts:
+        # Loads the audio stack and the Vosk model: only when speech is turned on
+        from smart_home.utils.voice_utils import streaming_tts, speech_to_text  # , wait_for_wake_word
+    if use_tts:
+        # The reply stream is spoken as-is: keep "[tool done]" progress lines out of it
+        agent.tool_progress = False
     chime = True  # Track if this is the first interaction
 
     while True:
-        if os.getenv("SPEECH_TO_TEXT", "False").lower() == "true":
+        # Connection / model load happens while the user speaks or types
+        agent.prewarm()
+
+        if use_stt:
             # WAKE WORD DISABLED - direct STT for now
             # wait_for_wake_word(model_paths=wake_models, threshold=0.2)
             print("\nListening...")
@@ -101,24 +153,22 @@ def converse_with_agent(Agent: Agent | None = None, session: Session | None = No
             print("Exiting the conversation.")
             break
 
-        def response_stream():
-            for chunk in agent.stream(user_input):
-                print(chunk, end="", flush=True)
-                yield chunk
-
         print("\nAI: ", end="")
 
-        if os.getenv("TEXT_TO_SPEECH", "False").lower() == "true":
-            streaming_tts(response_stream(), voice="Zira")
+        if use_tts:
+            streaming_tts(_echo_stream(agent, user_input), voice="Zira")
         else:
-            for _ in response_stream():
-                pass
+            _echo(agent, user_input)
 
         print("\n")
 
         chime = True
 
-        session.save() # Update saved session after each interactions
+        try:
+            session.save_async() # Update saved session after each interaction, off the prompt loop
+        except OSError as e:
+            # A previous save failed (disk full, permissions): tell the user, keep talking
+            print(f"(Could not save session: {e})")
 
 
 def main():
@@ -135,7 +185,7 @@ def main():
         session.set_primary_agent(agent)
         logger.info(f"Selected agent: {agent_name}")
         print(f"Using '{agent_name}' agent for conversation.")
-        converse_with_agent(Agent=agent, session=session)
+        converse_with_agent(agent=agent, session=session)
     else:
         converse_with_agent()
 
@@ -6,17 +6,78 @@ using the FastMCP Client library.
 """
 
 import os
+import orjson
 import logging
 import asyncio
+import time
 import atexit
-from typing import Dict, Optional, Any, List
-from threading import Lock
+from collections import OrderedDict
+from typing import Dict, Optional, Any, List, TYPE_CHECKING
+from threading import Lock, Thread
 
 from fastmcp import Client
 from fastmcp.client import StdioTransport
 
+from smart_home.config.env import load_env
+from smart_home.config.paths import DATA_DIR
+
+load_env()
+
+if TYPE_CHECKING:
+    from smart_home.mcp_integration.mcp_config import MCPServerConfig
+
 logger = logging.getLogger(__name__)
 
+# Tool schemas discovered from stdio servers, keyed by their command line. With a cached
+# schema an agent can be built without spawning the server; it is only started for a call.
+# Entries older than MCP_SCHEMA_CACHE_MAX_AGE seconds are rediscovered at startup, and a
+# cached schema is re-checked in the background once the server is running anyway (first
+# tool call), so an upgraded server's tools are picked up on the next run without
+# deleting the file.
+SCHEMA_CACHE_FILE = DATA_DIR / "mcp_tool_schemas.json"
+MCP_SCHEMA_CACHE_MAX_AGE = float(os.getenv("MCP_SCHEMA_CACHE_MAX_AGE", "86400"))
+
+
+# Results of read-only tools (see MCPServerConfig.cacheable_tools) are reused for identical
+# arguments for this many seconds; 0 disables the cache
+MCP_RESULT_CACHE_TTL = float(os.getenv("MCP_RESULT_CACHE_TTL", "60"))
+_RESULT_CACHE_SIZE = 512
+
+
+def _schema_cache_enabled() -> bool:
+    return os.getenv("MCP_SCHEMA_CACHE", "True").lower() in ("true", "1", "yes")
+
+
+def _load_schema_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(SCHEMA_CACHE_FILE, "rb") as f:
+            cache = orjson.loads(f.read())
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _cached_tools(key: str) -> Optional[List[Dict[str, Any]]]:
+    """Tools cached for a server command line, or None if missing or older than the max age."""
+    entry = _load_schema_cache().get(key)
+    # Entries are {"stored_at": epoch seconds, "tools": [...]}; anything else is rediscovered
+    if not isinstance(entry, dict) or not isinstance(entry.get("tools"), list):
+        return None
+    stored_at = entry.get("stored_at")
+    if not isinstance(stored_at, (int, float)) or time.time() - stored_at > MCP_SCHEMA_CACHE_MAX_AGE:
+        return None
+    return entry["tools"]
+
+
+def _save_schema_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    try:
+        tmp = SCHEMA_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, SCHEMA_CACHE_FILE)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Could not write MCP schema cache: {e}")
+
 
 class MCPClientManager:
     """
@@ -24,6 +85,10 @@ class MCPClientManager:
 
     Manages client lifecycle using manual async context management
     (__aenter__/__aexit__) to maintain persistent connections.
+
+    Each server gets one long-lived Client, connected on first use and owned by a
+    background event loop thread; sync callers hand coroutines to that loop, so a
+    tool call is a single request on an open session instead of a new process.
     """
 
     _instance = None
@@ -44,46 +109,88 @@ class MCPClientManager:
         self._initialized = True
         self._server_configs: Dict[str, Dict[str, Any]] = {}  # Store config for each server
         self._discovered_tools: Dict[str, List[Dict[str, Any]]] = {}
+        # Servers whose tools came from the schema cache and have not been re-listed yet
+        self._unverified: set = set()
+        # Environment inherited by every stdio server, snapshotted once instead of per server
+        self._base_env: Dict[str, str] = os.environ.copy()
+        self._clients: Dict[str, Client] = {}  # Connected clients, only touched on self._loop
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        # (server, tool, canonical arguments) -> (stored_at, result), least recently used first
+        self._result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._result_cache_lock = Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[Thread] = None
 
         # Register cleanup on exit
         atexit.register(self.stop_all)
 
         logger.info("MCPClientManager initialized")
 
-    async def _discover_tools_async(
-        self,
-        name: str,
-        transport_obj: StdioTransport,
-    ) -> List[Dict[str, Any]]:
+    def _run(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the manager's event loop (started on first use) and wait for it."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._loop_thread = Thread(target=loop.run_forever, name="mcp-clients", daemon=True)
+                    self._loop_thread.start()
+                    self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _get_client_async(self, name: str) -> Client:
+        """Return the connected client for a server, connecting (spawning it) if needed."""
+        lock = self._connect_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(name)
+            if client is not None and client.is_connected():
+                return client
+            if client is not None:
+                # The server went away (crashed or exited): start it again
+                logger.warning(f"MCP server '{name}' disconnected, reconnecting")
+                await self._close_client_async(name)
+
+            client = Client(transport=self._create_transport(name))
+            await client.__aenter__()
+            self._clients[name] = client
+            return client
+
+    async def _close_client_async(self, name: str) -> None:
+        client = self._clients.pop(name, None)
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as e:
+                logger.debug(f"Error closing MCP client '{name}': {e}")
+
+    async def _discover_tools_async(self, name: str) -> List[Dict[str, Any]]:
         """
         Discover tools from an MCP server.
 
+        The connection used for discovery stays open for the server's tool calls.
+
         Args:
             name: Server name
-            transport_obj: Transport to use
 
         Returns:
             List of tool dictionaries
         """
-        # Create temporary client for discovery
-        client = Client(transport=transport_obj)
-
-        async with client:
-            # FastMCP returns a list of Tool objects directly
-            tools = await client.list_tools()
-
-            # Convert Tool objects to dicts for storage
-            tool_dicts = []
-            for tool in tools:
-                tool_dict = {
-                    "name": tool.name,
-                    "description": tool.description or "",
-                    "inputSchema": tool.inputSchema or {},
-                }
-                tool_dicts.append(tool_dict)
-
-            logger.info(f"Discovered {len(tool_dicts)} tools from server '{name}'")
-            return tool_dicts
+        client = await self._get_client_async(name)
+
+        # FastMCP returns a list of Tool objects directly
+        tools = await client.list_tools()
+
+        # Convert Tool objects to dicts for storage
+        tool_dicts = []
+        for tool in tools:
+            tool_dict = {
+                "name": tool.name,
+                "description": tool.description or "",
+                "inputSchema": tool.inputSchema or {},
+            }
+            tool_dicts.append(tool_dict)
+
+        logger.info(f"Discovered {len(tool_dicts)} tools from server '{name}'")
+        return tool_dicts
 
     def start_client(
         self,
@@ -112,52 +219,143 @@ class MCPClientManager:
             return
 
         try:
-            if transport == "stdio":
-                if not command:
-                    raise ValueError(f"command required for stdio transport")
-
-                logger.info(f"Initializing stdio MCP server: {name}")
-                logger.debug(f"Command: {command} {' '.join(args or [])}")
-
-                # Build environment
-                import os
-                process_env = os.environ.copy()
-                if env:
-                    process_env.update(env)
-
-                # Store configuration for creating transports later
-                config = {
-                    "command": command,
-                    "args": args or [],
-                    "env": process_env
-                }
-
-                with self._lock:
-                    self._server_configs[name] = config
-
-                # Create temporary transport for tool discovery
-                transport_obj = StdioTransport(**config)
-
-                # Discover tools
-                tools = asyncio.run(self._discover_tools_async(name, transport_obj))
-                self._discovered_tools[name] = tools
-
-                logger.info(f"Successfully initialized MCP server: {name}")
-
-            elif transport == "http":
-                raise NotImplementedError(
-                    f"HTTP transport not yet implemented. "
-                    f"Check FastMCP documentation for HTTP connection API."
-                )
-            else:
-                raise ValueError(f"Unknown transport type: {transport}")
+            if self._register(name, transport, command, args, env, url):
+                # Discover tools (connects the server's persistent client)
+                self._store_tools(name, self._run(self._discover_tools_async(name)))
+            logger.info(f"Successfully initialized MCP server: {name}")
 
         except Exception as e:
             logger.error(f"Failed to initialize MCP server '{name}': {e}", exc_info=True)
             raise RuntimeError(f"Failed to initialize MCP server '{name}': {e}") from e
 
+    def start_all(self, configs: List["MCPServerConfig"]) -> Dict[str, Exception]:
+        """
+        Initialize several MCP servers at once.
+
+        Servers without cached schemas are connected and queried concurrently on the
+        manager's event loop, so startup takes as long as the slowest server rather than
+        the sum of all of them.
+
+        Args:
+            configs: Server configurations (see mcp_config.get_enabled_mcp_servers)
+
+        Returns:
+            The servers that failed to start, mapped to their error. The rest are ready.
+        """
+        failures: Dict[str, Exception] = {}
+        to_discover: List[str] = []
+
+        for config in configs:
+            if config.name in self._server_configs:
+                logger.debug(f"Server '{config.name}' already initialized")
+                continue
+            try:
+                if self._register(config.name, config.transport, config.command, config.args, config.env, config.url):
+                    to_discover.append(config.name)
+                else:
+                    logger.info(f"Successfully initialized MCP server: {config.name}")
+            except Exception as e:
+                failures[config.name] = e
+
+        if to_discover:
+            results = self._run(self._discover_many_async(to_discover))
+            for name, result in zip(to_discover, results):
+                if isinstance(result, Exception):
+                    failures[name] = result
+                else:
+                    self._store_tools(name, result)
+                    logger.info(f"Successfully initialized MCP server: {name}")
+
+        for name, error in failures.items():
+            logger.error(f"Failed to initialize MCP server '{name}': {error}", exc_info=error)
+        return failures
+
+    async def _discover_many_async(self, names: List[str]) -> List[Any]:
+        """Discover tools from several servers concurrently (exceptions are returned, not raised)."""
+        return await asyncio.gather(*(self._discover_tools_async(name) for name in names), return_exceptions=True)
+
+    def _register(
+        self,
+        name: str,
+        transport: str,
+        command: Optional[str],
+        args: Optional[List[str]],
+        env: Optional[Dict[str, str]],
+        url: Optional[str],
+    ) -> bool:
+        """
+        Store a server's configuration. Returns True if its tools still have to be
+        discovered, False if they were loaded from the schema cache.
+        """
+        if transport == "stdio":
+            if not command:
+                raise ValueError(f"command required for stdio transport")
+
+            logger.info(f"Initializing stdio MCP server: {name}")
+            logger.debug(f"Command: {command} {' '.join(args or [])}")
+
+            # Build environment
+            process_env = {**self._base_env, **env} if env else self._base_env
+
+            # Store configuration for creating transports later
+            config = {
+                "command": command,
+                "args": args or [],
+                "env": process_env
+            }
+
+            with self._lock:
+                self._server_configs[name] = config
+
+            # Reuse schemas discovered by an earlier run of the same command
+            if _schema_cache_enabled():
+                tools = _cached_tools(self._schema_key(name))
+                if tools is not None:
+                    logger.info(f"Using cached tool schemas for MCP server '{name}' ({len(tools)} tools)")
+                    self._discovered_tools[name] = tools
+                    self._unverified.add(name)
+                    return False
+            return True
+
+        elif transport == "http":
+            raise NotImplementedError(
+                f"HTTP transport not yet implemented. "
+                f"Check FastMCP documentation for HTTP connection API."
+            )
+        else:
+            raise ValueError(f"Unknown transport type: {transport}")
+
+    def _schema_key(self, name: str) -> str:
+        config = self._server_configs[name]
+        return " ".join([config["command"], *config["args"]])
+
+    def _store_tools(self, name: str, tools: List[Dict[str, Any]]) -> None:
+        """Keep freshly discovered tools, and remember them in the schema cache."""
+        self._discovered_tools[name] = tools
+        self._unverified.discard(name)
+        if _schema_cache_enabled():
+            schema_cache = _load_schema_cache()
+            schema_cache[self._schema_key(name)] = {"stored_at": time.time(), "tools": tools}
+            _save_schema_cache(schema_cache)
+
+    async def _refresh_tools_async(self, name: str) -> None:
+        """
+        Re-list a server's tools on its open connection and update the schema cache. Runs in
+        the background after the first call to a server whose schemas came from the cache.
+        """
+        try:
+            tools = await self._discover_tools_async(name)
+        except Exception as e:
+            logger.debug(f"Could not refresh tool schemas for MCP server '{name}': {e}")
+            return
+        if tools != self._discovered_tools.get(name):
+            # Toolsets are built once per process (see mcp_tools.create_mcp_tools)
+            logger.info(f"Tool schemas of MCP server '{name}' changed; the next run will use the new ones")
+        # Also renews stored_at; the file write stays off the event loop
+        await asyncio.to_thread(self._store_tools, name, tools)
+
     def _create_transport(self, name: str) -> StdioTransport:
-        """Create a fresh transport for a server."""
+        """Create a transport for a server's client."""
         config = self._server_configs.get(name)
         if not config:
             raise ValueError(f"Server '{name}' not initialized")
@@ -195,25 +393,26 @@ class MCPClientManager:
         Returns:
             Tool execution result
         """
-        # Create fresh transport for this call
-        transport = self._create_transport(server_name)
-
-        # Create fresh client for this call with async with
-        client = Client(transport=transport)
+        # Reuse the server's open session; only the first call (or one after a crash) connects
+        client = await self._get_client_async(server_name)
+        response = await client.call_tool(name=tool_name, arguments=arguments)
 
-        async with client:
-            response = await client.call_tool(name=tool_name, arguments=arguments)
+        if server_name in self._unverified:
+            # The server is running now, so checking the cached schemas costs one request
+            self._unverified.discard(server_name)
+            asyncio.ensure_future(self._refresh_tools_async(server_name))
 
-            # Extract content from response
-            if hasattr(response, 'content'):
-                return response.content
-            return response
+        # Extract content from response
+        if hasattr(response, 'content'):
+            return response.content
+        return response
 
     def call_tool(
         self,
         server_name: str,
         tool_name: str,
-        arguments: Dict[str, Any]
+        arguments: Dict[str, Any],
+        use_cache: bool = False,
     ) -> Any:
         """
         Call a tool on an MCP server (sync wrapper).
@@ -222,11 +421,34 @@ class MCPClientManager:
             server_name: Name of the server
             tool_name: Name of the tool to call
             arguments: Tool arguments
+            use_cache: Reuse a recent result for the same arguments (read-only tools only)
 
         Returns:
             Tool execution result
         """
-        return asyncio.run(self._call_tool_async(server_name, tool_name, arguments))
+        if not use_cache or MCP_RESULT_CACHE_TTL <= 0:
+            return self._run(self._call_tool_async(server_name, tool_name, arguments))
+
+        try:
+            key = (server_name, tool_name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+        except TypeError:
+            return self._run(self._call_tool_async(server_name, tool_name, arguments))
+
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < MCP_RESULT_CACHE_TTL:
+                self._result_cache.move_to_end(key)
+                logger.debug(f"Reusing cached result of {server_name}/{tool_name}")
+                return entry[1]
+
+        result = self._run(self._call_tool_async(server_name, tool_name, arguments))
+
+        with self._result_cache_lock:
+            self._result_cache[key] = (time.monotonic(), result)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > _RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
 
     def stop_client(self, name: str):
         """Stop a specific server."""
@@ -236,6 +458,9 @@ class MCPClientManager:
 
         try:
             logger.info(f"Stopping MCP server: {name}")
+            if self._loop is not None and self._loop.is_running():
+                # Bounded: a hung server must not block interpreter exit
+                self._run(self._close_client_async(name), timeout=5)
         except Exception as e:
             logger.error(f"Error stopping server '{name}': {e}")
         finally:
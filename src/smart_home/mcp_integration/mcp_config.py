@@ -20,6 +20,7 @@ class MCPServerConfig:
         env: Optional[Dict[str, str]] = None,
         url: Optional[str] = None,
         allowed_tools: Optional[list[str]] = None,
+        cacheable_tools: Optional[list[str]] = None,
     ):
         """
         Initialize MCP server configuration.
@@ -33,6 +34,8 @@ class MCPServerConfig:
             env: Optional environment variables for the server process
             url: Optional URL for HTTP transport (required if transport="http")
             allowed_tools: Optional whitelist of tool names to expose (None = all tools)
+            cacheable_tools: Read-only tools whose results may be reused for identical
+                arguments within MCP_RESULT_CACHE_TTL (None = never cache)
         """
         self.name = name
         self.env_var = env_var
@@ -42,6 +45,7 @@ class MCPServerConfig:
         self.env = env or {}
         self.url = url
         self.allowed_tools = allowed_tools
+        self.cacheable_tools = cacheable_tools
 
         # Validate configuration
         if self.transport == "http" and not self.url:
@@ -66,6 +70,7 @@ FETCH_SERVER = MCPServerConfig(
     args=["mcp-server-fetch"],
     transport="stdio",  # Use stdio transport with FastMCP
     allowed_tools=None,  # Allow all tools from this server
+    cacheable_tools=["fetch"],  # Re-fetching the same URL within the TTL reuses the page
 )
 
 
@@ -6,7 +6,8 @@ Works with all LLM providers (OpenAI, Ollama, etc.).
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 from smart_home.core.agent import Tool
 from smart_home.mcp_integration.mcp_config import MCPServerConfig, get_enabled_mcp_servers
@@ -15,6 +16,15 @@ from smart_home.mcp_integration.schema_converter import MCPSchemaConverter
 
 logger = logging.getLogger(__name__)
 
+# create_mcp_tools() results, keyed by the requested server set (None = all enabled)
+_TOOLSETS: Dict[Optional[Tuple[str, ...]], List["MCPToolWrapper"]] = {}
+_TOOLSETS_LOCK = threading.Lock()
+
+# The converter is stateless: one instance serves every wrapper
+_CONVERTER = MCPSchemaConverter()
+# extract_tool_info() results by (server, tool); a server's schemas are discovered once per process
+_TOOL_INFO: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
 
 class MCPToolWrapper(Tool):
     """
@@ -30,6 +40,7 @@ class MCPToolWrapper(Tool):
         tool_name: str,
         tool_schema: Dict[str, Any],
         client_manager: MCPClientManager,
+        cacheable: bool = False,
     ):
         """
         Initialize MCP tool wrapper.
@@ -39,14 +50,16 @@ class MCPToolWrapper(Tool):
             tool_name: Original tool name from the MCP server
             tool_schema: MCP tool schema (from list_tools response)
             client_manager: MCPClientManager instance for execution
+            cacheable: Tool is read-only, so results may be reused for identical arguments
         """
         # Create namespaced tool name to avoid conflicts
         # Format: {server_name}__{tool_name}
         namespaced_name = f"{server_name}__{tool_name}"
 
-        # Extract tool information
-        converter = MCPSchemaConverter()
-        tool_info = converter.extract_tool_info(tool_schema)
+        # Extract tool information (shared by every toolset that includes this tool)
+        tool_info = _TOOL_INFO.get((server_name, tool_name))
+        if tool_info is None:
+            tool_info = _TOOL_INFO[(server_name, tool_name)] = _CONVERTER.extract_tool_info(tool_schema)
 
         # Initialize base Tool
         super().__init__(
@@ -59,6 +72,7 @@ class MCPToolWrapper(Tool):
         self.server_name = server_name
         self.original_tool_name = tool_name
         self.client_manager = client_manager
+        self.cacheable = cacheable
 
         logger.debug(f"Created MCP tool wrapper: {namespaced_name}")
 
@@ -89,11 +103,11 @@ class MCPToolWrapper(Tool):
                 server_name=self.server_name,
                 tool_name=self.original_tool_name,
                 arguments=kwargs,
+                use_cache=self.cacheable,
             )
 
             # Convert result to string
-            converter = MCPSchemaConverter()
-            result_str = converter.convert_tool_result(result)
+            result_str = _CONVERTER.convert_tool_result(result)
 
             logger.debug(
                 f"MCP tool {self.name} returned {len(result_str)} characters"
@@ -135,7 +149,23 @@ def create_mcp_tools(server_names: Optional[List[str]] = None) -> List[MCPToolWr
 
         # Use in an agent
         agent = Agent(tools=create_mcp_tools())
+
+    The toolset for a given set of servers is built once per process and shared by
+    every agent that asks for it. An empty result (nothing enabled, or every server
+    failed to start) is not cached, so it is retried next time.
     """
+    key = tuple(sorted(set(server_names))) if server_names is not None else None
+    with _TOOLSETS_LOCK:
+        tools = _TOOLSETS.get(key)
+        if tools is None:
+            tools = _build_mcp_tools(server_names)
+            if tools:
+                _TOOLSETS[key] = tools
+    # A fresh list each time, so callers can extend it freely
+    return list(tools)
+
+
+def _build_mcp_tools(server_names: Optional[List[str]]) -> List[MCPToolWrapper]:
     enabled_servers = get_enabled_mcp_servers()
 
     if not enabled_servers:
@@ -167,20 +197,14 @@ def create_mcp_tools(server_names: Optional[List[str]] = None) -> List[MCPToolWr
     client_manager = MCPClientManager()
     tools = []
 
+    # Start FastMCP clients for every server at once (also discovers tools)
+    failures = client_manager.start_all(enabled_servers)
+
     for config in enabled_servers:
+        if config.name in failures:
+            # Already logged by start_all; continue with other servers
+            continue
         try:
-            logger.info(f"Initializing MCP server: {config.name}")
-
-            # Start FastMCP client (also discovers tools)
-            client = client_manager.start_client(
-                name=config.name,
-                transport=config.transport,
-                command=config.command,
-                args=config.args,
-                env=config.env,
-                url=config.url,
-            )
-
             # Get cached discovered tools
             mcp_tools = client_manager.get_discovered_tools(config.name)
             logger.info(
@@ -205,6 +229,7 @@ def create_mcp_tools(server_names: Optional[List[str]] = None) -> List[MCPToolWr
                         tool_name=mcp_tool["name"],
                         tool_schema=mcp_tool,
                         client_manager=client_manager,
+                        cacheable=mcp_tool["name"] in (config.cacheable_tools or ()),
                     )
                     tools.append(wrapper)
 
@@ -5,7 +5,7 @@ Handles bidirectional conversion between MCP's InputSchema format
 and the standard Tool parameters format.
 """
 
-import json
+import orjson
 import logging
 from typing import Dict, Any, List
 
@@ -190,9 +190,9 @@ class MCPSchemaConverter:
             if "message" in result:
                 return result["message"]
 
-            # Fallback: JSON serialize dict
+            # Fallback: JSON serialize dict (non-ASCII stays as-is, not \u escapes)
             try:
-                return json.dumps(result, indent=2)
+                return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
             except (TypeError, ValueError):
                 return str(result)
 
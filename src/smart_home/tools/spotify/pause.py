@@ -2,6 +2,9 @@ from smart_home.core.agent import Tool
 from smart_home.tools.spotify.utils import _spotify
 
 class SpotifyPauseTool(Tool):
+    # Changes playback state: runs in call order with the other Spotify controls
+    sequential = True
+
     def __init__(self):
         name = "spotify_pause"
         description = "Pause current playback."
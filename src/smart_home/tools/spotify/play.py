@@ -3,6 +3,9 @@ from smart_home.tools.spotify.utils import _spotify
 import os
 
 class SpotifyPlayTool(Tool):
+    # Must land after a spotify_switch_device in the same turn, not race it
+    sequential = True
+
     def __init__(self):
         name = "spotify_play"
         description = "Start/resume playback. Provide a URI/context_uri or a simple search query. You must provide a device"
@@ -6,6 +6,9 @@ logger = logging.getLogger(__name__)
 
 
 class CallSpotifyAgentTool(Tool):
+    # One shared sub-agent history: calls in the same turn must not interleave
+    sequential = True
+
     def __init__(self, session=None):
         name = "call_spotify_agent"
         description = "Calls a Spotify agent to handle music tasks"
@@ -20,30 +23,67 @@ class CallSpotifyAgentTool(Tool):
             "required": ["query"]
         }
         super().__init__(name, description, params, session=session)
+        # Sub-agent is created on first use and then reused, so its history and HTTP
+        # connection carry over between calls (and the provider can reuse the cached prefix)
+        self._spotify_agent = None
 
-    def call(self, query: str):
-        try:
+    def _needs_agent(self) -> bool:
+        return self._spotify_agent is None or self._spotify_agent.session is not self.state_session
+
+    def _set_agent(self, spotify_agent: SpotifyAgent) -> SpotifyAgent:
+        self._spotify_agent = spotify_agent
+        # The reply is returned as one string and injected into history: no progress lines in it
+        spotify_agent.tool_progress = False
+        # Register sub-agent in session for tracking
+        if self.state_session:
+            self.state_session.register_subagent(spotify_agent)
+        return spotify_agent
+
+    def _get_agent(self) -> SpotifyAgent:
+        if self._needs_agent():
             # Create SpotifyAgent with session reference
-            spotify_agent = SpotifyAgent(session=self.state_session)
+            return self._set_agent(SpotifyAgent(session=self.state_session))
+        return self._spotify_agent
 
-            # Register sub-agent in session for tracking
-            if self.state_session:
-                self.state_session.register_subagent(spotify_agent)
+    async def _aget_agent(self) -> SpotifyAgent:
+        if self._needs_agent():
+            return self._set_agent(await SpotifyAgent.acreate(session=self.state_session))
+        return self._spotify_agent
+
+    def call(self, query: str):
+        try:
+            spotify_agent = self._get_agent()
 
             def response_stream():
                 for chunk in spotify_agent.stream(query):
                     yield chunk
 
             response = "".join(response_stream())
+            return self._inject_response(spotify_agent, query, response)
+        except Exception as e:
+            logger.error(f"CallSpotifyAgentTool failed: {e}", exc_info=True)
+            return f"Error: {e}"
 
-            # CRITICAL: If session exists, inject response into primary agent's history
-            # This prevents the parent agent from making a redundant LLM call
-            if self.state_session and self.state_session.primary_agent:
-                self.state_session.append_to_primary_agent(
-                    role="assistant",
-                    content=response,
-                )
-                # Log tracking info separately (not in message for OpenAI compliance)
+    async def acall(self, query: str):
+        # Used from Agent.astream: the sub-agent streams over the same event loop
+        try:
+            spotify_agent = await self._aget_agent()
+            response = "".join([chunk async for chunk in spotify_agent.astream(query)])
+            return self._inject_response(spotify_agent, query, response)
+        except Exception as e:
+            logger.error(f"CallSpotifyAgentTool failed: {e}", exc_info=True)
+            return f"Error: {e}"
+
+    def _inject_response(self, spotify_agent: SpotifyAgent, query: str, response: str) -> str:
+        # CRITICAL: If session exists, inject response into primary agent's history
+        # This prevents the parent agent from making a redundant LLM call
+        if self.state_session and self.state_session.primary_agent:
+            self.state_session.append_to_primary_agent(
+                role="assistant",
+                content=response,
+            )
+            # Log tracking info separately (not in message for OpenAI compliance)
+            if logger.isEnabledFor(logging.INFO):
                 logger.info(
                     f"Injected SpotifyAgent response into primary agent",
                     extra={
@@ -55,7 +95,4 @@ class CallSpotifyAgentTool(Tool):
                     }
                 )
 
-            return response
-        except Exception as e:
-            logger.error(f"CallSpotifyAgentTool failed: {e}", exc_info=True)
-            return f"Error: {e}"
\ No newline at end of file
+        return response
\ No newline at end of file
@@ -2,6 +2,9 @@ from smart_home.core.agent import Tool
 from smart_home.tools.spotify.utils import _spotify
 
 class SpotifyDeviceSwitchTool(Tool):
+    # Later playback calls in the same turn target the device this selects
+    sequential = True
+
     def __init__(self):
         name = "spotify_switch_device"
         description = "Transfer playback to a device by name or id."
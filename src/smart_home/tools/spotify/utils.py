@@ -1,7 +1,10 @@
 import os
 import time
+import asyncio
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from smart_home.core.agent import get_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +13,9 @@ logger = logging.getLogger(__name__)
 class _SpotifyClient:
     def __init__(self):
         self.session = requests.Session()
+        # Keep-alive connections to the accounts and API hosts are reused across calls
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             "User-Agent": os.getenv("SPOTIFY_USER_AGENT", "SmartHomeAssistant/1.0")
         })
@@ -22,7 +28,7 @@ class _SpotifyClient:
         self._expiry_ts = 0
 
     def _ensure_token(self):
-        if self._access_token and time.time() < self._expiry_ts - 30:
+        if self._access_token and time.monotonic() < self._expiry_ts - 30:
             return
         if not (self.client_id and self.client_secret and self.refresh_token):
             raise RuntimeError("Spotify OAuth env vars missing.")
@@ -38,7 +44,7 @@ class _SpotifyClient:
         resp.raise_for_status()
         data = resp.json()
         self._access_token = data["access_token"]
-        self._expiry_ts = time.time() + int(data.get("expires_in", 3600))
+        self._expiry_ts = time.monotonic() + int(data.get("expires_in", 3600))
         self.session.headers["Authorization"] = f"Bearer {self._access_token}"
 
     def _request(self, method, path, *, params=None, json=None):
@@ -53,6 +59,21 @@ class _SpotifyClient:
     def list_devices(self):
         return self._request("GET", "/me/player/devices").get("devices", [])
 
+    async def alist_devices(self):
+        """list_devices() over the shared async HTTP client (the rare token refresh runs on a thread)."""
+        if not (self._access_token and time.monotonic() < self._expiry_ts - 30):
+            await asyncio.to_thread(self._ensure_token)
+        r = await get_async_client().get(
+            f"{self.base}/me/player/devices",
+            headers={
+                "User-Agent": self.session.headers["User-Agent"],
+                "Authorization": f"Bearer {self._access_token}",
+            },
+            timeout=8.0,
+        )
+        r.raise_for_status()
+        return r.json().get("devices", [])
+
     def resolve_device_id(self, device_or_id: str | None):
         if not device_or_id:
             return None
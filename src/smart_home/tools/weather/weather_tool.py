@@ -1,23 +1,64 @@
 import os
 import time
+import asyncio
+import functools
 import requests
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Tuple
 from datetime import datetime, timezone, timedelta
-from smart_home.core.agent import Tool
-from dotenv import load_dotenv
-
-load_dotenv()
+from smart_home.core.agent import Tool, get_async_client
 
 logger = logging.getLogger(__name__)
 
+# Environment is read once at import, not per tool instance / call
+_TIMEZONE = os.getenv("TIMEZONE", "").strip()
+_USER_AGENT = os.getenv("WEATHER_USER_AGENT", "SmartHomeAssistant/1.0 (contact: you@example.com)")
+_HOME_GRID = os.getenv("HOME_GRID", "").strip()
+
+# weather.gov responses cached by URL: forecasts update roughly hourly, point->grid lookups never change
+_FORECAST_TTL = 300.0
+_POINTS_TTL = 24 * 3600.0
+_JSON_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_JSON_CACHE_LOCK = threading.Lock()
+
+
+def _cached_json(url: str, ttl: float) -> Dict[str, Any] | None:
+    with _JSON_CACHE_LOCK:
+        cached = _JSON_CACHE.get(url)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    return None
+
+
+def _store_json(url: str, data: Dict[str, Any]) -> None:
+    with _JSON_CACHE_LOCK:
+        _JSON_CACHE[url] = (time.monotonic(), data)
+
+# One pooled session for all WeatherTool instances, so repeat calls reuse the TLS connection
+_WX_SESSION: requests.Session | None = None
+
+
+_WX_SESSION_LOCK = threading.Lock()
+
+
+def _weather_session() -> requests.Session:
+    global _WX_SESSION
+    if _WX_SESSION is None:
+        with _WX_SESSION_LOCK:
+            if _WX_SESSION is None:
+                session = requests.Session()
+                # Retries are handled in WeatherTool._fetch_json
+                session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                _WX_SESSION = session
+    return _WX_SESSION
+
 class WeatherTool(Tool):
 
     def __init__(self):
         # Get timezone info for tool description
-        tz_env = os.getenv("TIMEZONE", "").strip()
-        if tz_env:
-            local_timezone = tz_env
+        if _TIMEZONE:
+            local_timezone = _TIMEZONE
         else:
             # Auto-detect from system
             now = datetime.now().astimezone()
@@ -56,19 +97,17 @@ class WeatherTool(Tool):
         }
         super().__init__(name, description, params)
 
-        self.session = requests.Session()
+        self.session = _weather_session()
         self.base = "https://api.weather.gov"
         self.timeout = 8.0
-        self.user_agent = os.getenv(
-            "WEATHER_USER_AGENT",
-            "SmartHomeAssistant/1.0 (contact: you@example.com)"
-        )
-        self.home_grid = os.getenv("HOME_GRID", "").strip()
+        self.user_agent = _USER_AGENT
+        self.home_grid = _HOME_GRID
 
-        self.session.headers.update({
+        # Sent with each request: the pooled session is shared, so its own headers stay untouched
+        self.headers = {
             "User-Agent": self.user_agent,
             "Accept": "application/ld+json, application/json"
-        })
+        }
 
     def call(
         self,
@@ -77,72 +116,104 @@ class WeatherTool(Tool):
         location: str = "home",
     ) -> str:
         try:
-            # Validate timestamp format
-            if forecast_times_iso.lower() != "now":
-                # Check if timestamp has timezone info
-                if not ('+' in forecast_times_iso or '-' in forecast_times_iso.split('T')[-1] or forecast_times_iso.endswith('Z')):
-                    # Try to parse and add local timezone as fallback
-                    try:
-                        dt_naive = datetime.fromisoformat(forecast_times_iso)
-                        # Get system timezone
-                        from datetime import datetime as dt_class
-                        local_tz = dt_class.now().astimezone().tzinfo
-                        dt_aware = dt_naive.replace(tzinfo=local_tz)
-                        forecast_times_iso = dt_aware.isoformat()
-                        logger.warning(
-                            f"Timestamp was missing timezone, added local timezone: {forecast_times_iso}",
-                            extra={"tool_name": "get_weather", "original": forecast_times_iso}
-                        )
-                    except Exception as e:
-                        return f"Error: Timestamp must include timezone offset (e.g., '2025-11-12T18:00:00-05:00' or end with 'Z'). Got: '{forecast_times_iso}'. Please provide a complete ISO-8601 timestamp with timezone."
+            forecast_times_iso, error = self._normalize_time(forecast_times_iso)
+            if error:
+                return error
 
             lat, lon, grid = self._resolve_location(location)
-            # Build forecast URLs
-            if grid:
-                grid_id, grid_x, grid_y = grid
-                forecast_url = f"{self.base}/gridpoints/{grid_id}/{grid_x},{grid_y}/forecast"
-                hourly_url = f"{forecast_url}/hourly"
-            else:
-                points = self._points(lat, lon)
-                forecast_url = points["forecast"]
-                hourly_url = points["forecastHourly"]
-
-            if granularity == "hourly":
-                hourly = self._get_json(hourly_url)
-                summary_str = summarize_nws_hourly(
-                    hourly["periods"],
-                    forecast_times_iso,
-                    units="F",
-                )
-            else:  # "daily" (default)
-                daily = self._get_json(forecast_url)
-                summary_str = summarize_nws_daily(
-                    daily["periods"],
-                    forecast_times_iso,
-                    units="F",
-                )
+            points = self._points(lat, lon) if not grid else None
+            url = self._forecast_url(granularity, grid, points)
+            return self._summarize(self._get_json(url), granularity, forecast_times_iso, location)
 
-            logger.info(
-                f"Weather forecast retrieved for {location}",
-                extra={"tool_name": "get_weather", "location": location, "granularity": granularity}
-            )
-            return summary_str
+        except Exception as e:
+            return self._error(e, location)
+
+    async def acall(
+        self,
+        granularity: str = "daily",
+        forecast_times_iso: str = "now",
+        location: str = "home",
+    ) -> str:
+        """Async version of call(): weather.gov requests go through the shared httpx client."""
+        try:
+            forecast_times_iso, error = self._normalize_time(forecast_times_iso)
+            if error:
+                return error
+
+            lat, lon, grid = self._resolve_location(location)
+            points = await self._apoints(lat, lon) if not grid else None
+            url = self._forecast_url(granularity, grid, points)
+            return self._summarize(await self._aget_json(url), granularity, forecast_times_iso, location)
 
         except Exception as e:
-            logger.error(
-                f"WeatherTool error: {e}",
-                exc_info=True,
-                extra={"tool_name": "get_weather", "location": location}
+            return self._error(e, location)
+
+    def _normalize_time(self, forecast_times_iso: str) -> Tuple[str, str | None]:
+        """Return (timestamp, error). Timestamps without an offset get the local timezone."""
+        # Validate timestamp format
+        if forecast_times_iso.lower() != "now":
+            # Check if timestamp has timezone info
+            if not ('+' in forecast_times_iso or '-' in forecast_times_iso.split('T')[-1] or forecast_times_iso.endswith('Z')):
+                # Try to parse and add local timezone as fallback
+                try:
+                    dt_naive = datetime.fromisoformat(forecast_times_iso)
+                    # Get system timezone
+                    local_tz = datetime.now().astimezone().tzinfo
+                    dt_aware = dt_naive.replace(tzinfo=local_tz)
+                    forecast_times_iso = dt_aware.isoformat()
+                    logger.warning(
+                        f"Timestamp was missing timezone, added local timezone: {forecast_times_iso}",
+                        extra={"tool_name": "get_weather", "original": forecast_times_iso}
+                    )
+                except Exception as e:
+                    return forecast_times_iso, f"Error: Timestamp must include timezone offset (e.g., '2025-11-12T18:00:00-05:00' or end with 'Z'). Got: '{forecast_times_iso}'. Please provide a complete ISO-8601 timestamp with timezone."
+        return forecast_times_iso, None
+
+    def _forecast_url(self, granularity: str, grid, points: Dict[str, Any] | None) -> str:
+        # Build forecast URLs
+        if grid:
+            grid_id, grid_x, grid_y = grid
+            forecast_url = f"{self.base}/gridpoints/{grid_id}/{grid_x},{grid_y}/forecast"
+            hourly_url = f"{forecast_url}/hourly"
+        else:
+            forecast_url = points["forecast"]
+            hourly_url = points["forecastHourly"]
+        return hourly_url if granularity == "hourly" else forecast_url
+
+    def _summarize(self, forecast: Dict[str, Any], granularity: str, forecast_times_iso: str, location: str) -> str:
+        if granularity == "hourly":
+            summary_str = summarize_nws_hourly(
+                forecast["periods"],
+                forecast_times_iso,
+                units="F",
+            )
+        else:  # "daily" (default)
+            summary_str = summarize_nws_daily(
+                forecast["periods"],
+                forecast_times_iso,
+                units="F",
             )
-            return f"Error: {e}"
+
+        logger.info(
+            f"Weather forecast retrieved for {location}",
+            extra={"tool_name": "get_weather", "location": location, "granularity": granularity}
+        )
+        return summary_str
+
+    def _error(self, e: Exception, location: str) -> str:
+        logger.error(
+            f"WeatherTool error: {e}",
+            exc_info=True,
+            extra={"tool_name": "get_weather", "location": location}
+        )
+        return f"Error: {e}"
 
 
     # ----- resolution / http -----
     def _resolve_location(self, location: str):
         if location.lower() == "home":
             if self.home_grid and self.home_grid.count(",") == 2:
-                grid_id, x_s, y_s = [p.strip() for p in self.home_grid.split(",")]
-                return None, None, (grid_id, int(x_s), int(y_s))
+                return None, None, _parse_grid(self.home_grid)
             raise ValueError("Home location not configured correctly (set HOME_GRID env var).")
         if "," in location:
             lat_s, lon_s = location.split(",", 1)
@@ -151,13 +222,35 @@ class WeatherTool(Tool):
 
     def _points(self, lat: float, lon: float) -> Dict[str, Any]:
         url = f"{self.base}/points/{lat:.4f},{lon:.4f}"
-        return self._get_json(url)
+        return self._get_json(url, ttl=_POINTS_TTL)
 
-    def _get_json(self, url: str) -> Dict[str, Any]:
+    async def _apoints(self, lat: float, lon: float) -> Dict[str, Any]:
+        url = f"{self.base}/points/{lat:.4f},{lon:.4f}"
+        return await self._aget_json(url, ttl=_POINTS_TTL)
+
+    def _get_json(self, url: str, ttl: float = _FORECAST_TTL) -> Dict[str, Any]:
+        cached = _cached_json(url, ttl)
+        if cached is not None:
+            return cached
+
+        data = self._fetch_json(url)
+        _store_json(url, data)
+        return data
+
+    async def _aget_json(self, url: str, ttl: float = _FORECAST_TTL) -> Dict[str, Any]:
+        cached = _cached_json(url, ttl)
+        if cached is not None:
+            return cached
+
+        data = await self._afetch_json(url)
+        _store_json(url, data)
+        return data
+
+    def _fetch_json(self, url: str) -> Dict[str, Any]:
         last = None
         for i in range(3):
             try:
-                r = self.session.get(url, timeout=self.timeout)
+                r = self.session.get(url, headers=self.headers, timeout=self.timeout)
                 r.raise_for_status()
                 return r.json()
             except Exception as e:
@@ -169,6 +262,28 @@ class WeatherTool(Tool):
                 time.sleep(0.25 * (i + 1))
         raise last
 
+    async def _afetch_json(self, url: str) -> Dict[str, Any]:
+        client = get_async_client()
+        last = None
+        for i in range(3):
+            try:
+                r = await client.get(url, headers=self.headers, timeout=self.timeout)
+                r.raise_for_status()
+                return r.json()
+            except Exception as e:
+                logger.debug(
+                    f"Weather API request retry {i+1}/3",
+                    extra={"tool_name": "get_weather", "url": url, "error": str(e)}
+                )
+                last = e
+                await asyncio.sleep(0.25 * (i + 1))
+        raise last
+
+@functools.lru_cache(maxsize=8)
+def _parse_grid(home_grid: str) -> Tuple[str, int, int]:
+    grid_id, x_s, y_s = [p.strip() for p in home_grid.split(",")]
+    return grid_id, int(x_s), int(y_s)
+
 # ----- shaping -----
 def _parse_iso(s: str) -> datetime:
     return datetime.fromisoformat(s)
@@ -1,10 +1,8 @@
 import os
 import requests
 from smart_home.core.agent import Tool
-from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-load_dotenv()
 
 class GetDevicesTool(Tool):
     def __init__(self, base_url=None, api_key=None):
@@ -1,12 +1,13 @@
 import os
 import requests
 from smart_home.core.agent import Tool
-from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-load_dotenv()
 
 class SetDevicesTool(Tool):
+    # Writes device state: calls in one turn apply in order instead of interleaving
+    sequential = True
+
     def __init__(self, base_url=None, api_key=None):
         self.base_url = base_url or os.getenv("ZIGBEE_API_BASE_URL", "http://localhost:8000")
         self.api_key = api_key or os.getenv("ZIGBEE_API_KEY")
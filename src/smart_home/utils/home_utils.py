@@ -1,10 +1,28 @@
 import os
+import time
+import logging
 import requests
-from dotenv import load_dotenv
+import threading
 from typing import Optional
+from smart_home.config.env import load_env
+from smart_home.core.cache import AGENT_PROMPT_CACHE_TTL, ttl_cache
 
-load_dotenv()
+load_env()
 
+logger = logging.getLogger(__name__)
+
+DEVICES_UNAVAILABLE = "Unable to fetch device list. Ensure the Zigbee API server is running."
+
+# SMART_HOME_OFFLINE=1 (CI, smoke tests, offline dev): agent prompts skip the Zigbee API
+# instead of waiting for a connection that will be refused or time out
+SMART_HOME_OFFLINE = os.getenv("SMART_HOME_OFFLINE") == "1"
+
+# (connect, read) timeouts: the Zigbee API is on the local network, so a refused or
+# unroutable connection should fail fast
+_TIMEOUT = (1, 5)
+
+
+@ttl_cache(AGENT_PROMPT_CACHE_TTL)
 def get_bedroom_temperature(
     device_name: str = None,
     base_url: str = None,
@@ -40,11 +58,11 @@ def get_bedroom_temperature(
         headers["X-API-Key"] = api_key
 
     try:
-        response = requests.get(url, headers=headers, timeout=5)
+        response = requests.get(url, headers=headers, timeout=_TIMEOUT)
         response.raise_for_status()
     except requests.Timeout:
         raise requests.RequestException(
-            f"Request to {url} timed out after 5 seconds. "
+            f"Request to {url} timed out. "
             "Check if the Zigbee API server is running."
         )
     except requests.ConnectionError:
@@ -98,6 +116,8 @@ def get_all_devices_summary(
 ) -> str:
     """Fetch all connected Zigbee devices and format them as a plain text summary.
 
+    Not cached here: agent prompts go through DeviceContextCache, which owns the TTL.
+
     Args:
         base_url: API base URL (defaults to ZIGBEE_API_BASE_URL env var or localhost:8000)
         api_key: API authentication key (defaults to ZIGBEE_API_KEY env var)
@@ -117,11 +137,11 @@ def get_all_devices_summary(
         headers["X-API-Key"] = api_key
 
     try:
-        response = requests.get(url, headers=headers, timeout=5)
+        response = requests.get(url, headers=headers, timeout=_TIMEOUT)
         response.raise_for_status()
     except requests.Timeout:
         raise requests.RequestException(
-            f"Request to {url} timed out after 5 seconds. "
+            f"Request to {url} timed out. "
             "Check if the Zigbee API server is running."
         )
     except requests.ConnectionError:
@@ -152,12 +172,77 @@ def get_all_devices_summary(
     # Format devices into a readable summary
     lines = ["Available Zigbee Devices:"]
 
+    entries = []
     for device in devices.get("devices", []):
         device_name = device.get("friendly_name", "Unknown")
         device_definition = device.get("definition", {})
         device_description = device_definition.get("description", "No description") if device_definition else "No description"
 
-        info = f"- {device_name} ({device_description})"
-        lines.append(info)
+        info = f"- {_squash_whitespace(device_name)} ({_squash_whitespace(device_description)})"
+        entries.append(info)
+
+    # Canonical order and spacing: the same devices always render to the same prompt bytes,
+    # whatever order the API returns them in
+    lines.extend(sorted(entries, key=lambda line: (line.casefold(), line)))
+
+    return "\n".join(lines)
+
+
+def _squash_whitespace(value) -> str:
+    return " ".join(str(value).split())
+
+
+def get_temperature_for_prompt() -> str:
+    """get_bedroom_temperature() for agent system prompts; "unknown" when SMART_HOME_OFFLINE is set."""
+    if SMART_HOME_OFFLINE:
+        return "unknown"
+    return get_bedroom_temperature()
+
+
+class DeviceContextCache:
+    """
+    Stale-while-revalidate holder for the device summary in agent system prompts.
+
+    get() returns the last known summary immediately; once it is older than
+    AGENT_PROMPT_CACHE_TTL a daemon thread refetches it for the next agent. Only the very
+    first call (or any call with the TTL set to 0) waits for the Zigbee API.
+    """
 
-    return "\n".join(lines)
\ No newline at end of file
+    _value: Optional[str] = None
+    _expires_at: float = 0.0
+    _refreshing: bool = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> str:
+        if SMART_HOME_OFFLINE:
+            return "(offline)"
+        if AGENT_PROMPT_CACHE_TTL <= 0:
+            return cls._fetch() or DEVICES_UNAVAILABLE
+        with cls._lock:
+            value = cls._value
+            if value is not None and time.monotonic() >= cls._expires_at and not cls._refreshing:
+                cls._refreshing = True
+                threading.Thread(target=cls._refresh, name="device-context-refresh", daemon=True).start()
+        if value is None:
+            value = cls._refresh()
+        return value or DEVICES_UNAVAILABLE
+
+    @classmethod
+    def _refresh(cls) -> Optional[str]:
+        value = cls._fetch()
+        with cls._lock:
+            if value is not None:
+                cls._value = value
+            # On failure keep serving the previous summary; retry after another TTL
+            cls._expires_at = time.monotonic() + AGENT_PROMPT_CACHE_TTL
+            cls._refreshing = False
+            return cls._value
+
+    @staticmethod
+    def _fetch() -> Optional[str]:
+        try:
+            return get_all_devices_summary()
+        except Exception as e:
+            logger.warning(f"Failed to fetch devices for system prompt: {e}")
+            return None
@@ -12,7 +12,7 @@ import pyttsx3
 import simpleaudio as sa
 import sounddevice as sd
 import winsound
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from vosk import Model, KaldiRecognizer
 from openwakeword.model import Model as WakeWordModel
 from openwakeword.utils import download_models as oww_download_models
@@ -128,33 +128,73 @@ class TTSThread(threading.Thread):
         engine.endLoop()
 
 
+# Where streamed text is cut for speech: sentence ends, commas once the clause is long enough
+# to sound natural on its own, or a hard cap for run-on text with no punctuation at all.
+# The punctuation must be followed by whitespace, so "3.5" or "e.g." split across two stream
+# chunks is not cut in the middle.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s")
+_CLAUSE_END = re.compile(r",\s")
+_WHITESPACE = re.compile(r"\s+")
+_MIN_CLAUSE_WORDS = 4
+_MAX_CHUNK_WORDS = 80
+
+
+def _split_speakable(buffer: str) -> tuple[str | None, str]:
+    """Return (piece, rest) for the first speakable piece in `buffer`, or (None, buffer)."""
+    sentence = _SENTENCE_END.search(buffer)
+    limit = sentence.start() if sentence else len(buffer)
+    for clause in _CLAUSE_END.finditer(buffer, 0, limit):
+        if len(buffer[:clause.start()].split()) >= _MIN_CLAUSE_WORDS:
+            return buffer[:clause.end()], buffer[clause.end():]
+    if sentence:
+        return buffer[:sentence.end()], buffer[sentence.end():]
+    words = buffer.split()
+    if len(words) > _MAX_CHUNK_WORDS:
+        # Cut before the last word, which may still be arriving
+        cut = buffer.rstrip().rfind(" ")
+        if cut > 0:
+            return buffer[:cut], buffer[cut:]
+    return None, buffer
+
+
+def _speakable(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).replace("'", "").strip()
+
+
+def sentence_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Regroup streamed model output into pieces to speak, each yielded as soon as it is
+    complete, so speech starts after the first sentence instead of the whole reply.
+    Whatever is left when the stream ends is yielded last.
+    """
+    buffer = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += str(chunk)
+        while True:
+            piece, buffer = _split_speakable(buffer)
+            if piece is None:
+                break
+            piece = _speakable(piece)
+            if piece:
+                yield piece
+
+    # Flush leftover if anything remains (in case no period at the end)
+    rest = _speakable(buffer)
+    if rest:
+        yield rest
+
+
 def streaming_tts(chunks: Iterable[str], rate=180, volume=1.0, voice=None):
     q = queue.Queue()
     tts_thread = TTSThread(q, rate=rate, volume=volume, voice=voice)
 
-    buffer = ""
     try:
-        for chunk in chunks:
-            if not chunk:
-                continue
-            text = re.sub(r"\s+", " ", str(chunk))
-            text = re.sub("'", "", text)
-            buffer += " " + text
-
-            # chunk where sentences end or commas are place for a good mix of streaming with natural pauses
-            while True:
-                match = re.search(r'(.+?[,.!?])(\s+|$)', buffer)
-                if not match:
-                    break
-                sentence = match.group(1).strip()
-                if sentence:
-                    q.put(sentence)
-                # remove the flushed sentence from buffer
-                buffer = buffer[match.end():].lstrip()
-
-        # Flush leftover if anything remains (in case no period at the end)
-        if buffer.strip():
-            q.put(buffer.strip())
+        # Each sentence is queued the moment it is complete; the TTS thread speaks it while
+        # the model keeps generating the next one
+        for sentence in sentence_chunks(chunks):
+            q.put(sentence)
     finally:
         q.put("__STOP__")
         tts_thread.join()
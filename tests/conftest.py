@@ -0,0 +1,7 @@
+import os
+
+# Settings are read at import: pin them before smart_home is imported, and keep the
+# developer's .env and the Zigbee API out of the test run
+os.environ["SMART_HOME_LOAD_DOTENV"] = "0"
+os.environ["SMART_HOME_OFFLINE"] = "1"
+os.environ.setdefault("PROVIDER", "ollama")
@@ -0,0 +1,84 @@
+"""Agent.stream hand-off between the socket-reader thread and the consumer."""
+import threading
+import time
+
+import pytest
+
+from smart_home.core.agent import Agent
+
+
+def stream_threads(agent):
+    return [t for t in threading.enumerate() if t.name == f"stream-{agent.agent_id}" and t.is_alive()]
+
+
+def fake_turn(agent, tool_time=0.2):
+    """Stands in for _stream_ollama: a token, a tool call that edits the history, more tokens."""
+    closed = threading.Event()
+
+    def inner(max_tool_loops):
+        try:
+            yield "Turning on "
+            time.sleep(tool_time)
+            agent.messages.append({"role": "tool", "content": "lights on"})
+            yield "the lights."
+            time.sleep(tool_time)
+            agent.messages.append({"role": "assistant", "content": "Turning on the lights."})
+        finally:
+            closed.set()
+
+    return inner, closed
+
+
+@pytest.fixture
+def agent():
+    return Agent(provider="ollama", tool_progress=False)
+
+
+def test_stream_yields_every_token(agent):
+    agent._stream_ollama, closed = fake_turn(agent, tool_time=0)
+
+    assert "".join(agent.stream("lights on")) == "Turning on the lights."
+    assert closed.is_set()
+    assert not stream_threads(agent)
+
+
+def test_abandoned_stream_stops_the_reader_before_returning(agent):
+    agent._stream_ollama, closed = fake_turn(agent)
+
+    stream = agent.stream("lights on")
+    assert next(stream) == "Turning on "
+    stream.close()
+
+    # The reader has finished and closed the turn by the time close() returns...
+    assert closed.is_set()
+    assert not stream_threads(agent)
+    # ...so nothing edits the history behind the next turn's back
+    snapshot = list(agent.messages)
+    time.sleep(0.5)
+    assert agent.messages == snapshot
+    assert {"role": "assistant", "content": "Turning on the lights."} not in agent.messages
+
+
+def test_next_turn_after_abandoned_stream_sees_a_settled_history(agent):
+    agent._stream_ollama, _ = fake_turn(agent)
+    for chunk in agent.stream("lights on"):
+        break
+
+    agent._stream_ollama, _ = fake_turn(agent, tool_time=0)
+    before = len(agent.messages)
+    assert "".join(agent.stream("again")) == "Turning on the lights."
+    # user + tool + assistant of the second turn only
+    assert len(agent.messages) == before + 3
+
+
+def test_reader_errors_reach_the_consumer(agent):
+    def inner(max_tool_loops):
+        yield "partial"
+        raise ConnectionError("model server went away")
+
+    agent._stream_ollama = inner
+    stream = agent.stream("hi")
+    assert next(stream) == "partial"
+    with pytest.raises(ConnectionError):
+        next(stream)
+    assert not stream_threads(agent)
@@ -0,0 +1,172 @@
+"""Tool execution in Agent: concurrency, sequential ordering, deduplication, argument parsing."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from smart_home.core.agent import Agent, Tool
+
+DELAY = 0.2
+
+
+class SleepTool(Tool):
+    """Records when each call starts and ends, then returns its argument."""
+
+    def __init__(self, name, log, sequential=False):
+        super().__init__(name, "", {"type": "object", "properties": {}})
+        self.sequential = sequential
+        self.log = log
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, value=None, **_):
+        with self._lock:
+            self.calls += 1
+        self.log.append(("start", self.name, value))
+        time.sleep(DELAY)
+        self.log.append(("end", self.name, value))
+        return f"{self.name}:{value}"
+
+
+def make_agent(*tools):
+    return Agent(tools=list(tools), provider="ollama", tool_progress=False)
+
+
+def run_turn(agent, calls):
+    start = agent._dedup_starts(agent._start_tool)
+    futures = [start(name, args) for name, args in calls]
+    results = []
+    for _ in agent._finish_tools(calls, futures, results):
+        pass
+    return results
+
+
+def arun_turn(agent, calls):
+    async def turn():
+        start = agent._dedup_starts(agent._astart_tool)
+        tasks = [start(name, args) for name, args in calls]
+        results = []
+        async for _ in agent._afinish_tools(calls, tasks, results):
+            pass
+        return results
+
+    return asyncio.run(turn())
+
+
+@pytest.fixture(params=["sync", "async"])
+def turn(request):
+    return run_turn if request.param == "sync" else arun_turn
+
+
+def test_parallel_tools_overlap_and_keep_call_order(turn):
+    log = []
+    agent = make_agent(SleepTool("a", log), SleepTool("b", log), SleepTool("c", log))
+    calls = [("c", {"value": 1}), ("a", {"value": 2}), ("b", {"value": 3})]
+
+    started = time.monotonic()
+    results = turn(agent, calls)
+    elapsed = time.monotonic() - started
+
+    assert results == ["c:1", "a:2", "b:3"]
+    assert elapsed < DELAY * 2
+    # Every call started before any finished
+    assert [event for event, _, _ in log[:3]] == ["start"] * 3
+
+
+def test_sequential_tools_run_one_at_a_time_in_call_order(turn):
+    log = []
+    switch = SleepTool("switch", log, sequential=True)
+    play = SleepTool("play", log, sequential=True)
+    agent = make_agent(switch, play)
+    calls = [("switch", {"value": "den"}), ("play", {"value": "song"}), ("switch", {"value": "den"})]
+
+    results = turn(agent, calls)
+
+    assert results == ["switch:den", "play:song", "switch:den"]
+    assert log == [
+        ("start", "switch", "den"), ("end", "switch", "den"),
+        ("start", "play", "song"), ("end", "play", "song"),
+        ("start", "switch", "den"), ("end", "switch", "den"),
+    ]
+    # Identical sequential calls may change state each time, so they are not merged
+    assert switch.calls == 2
+
+
+def test_sequential_tools_run_while_parallel_tools_are_in_flight(turn):
+    log = []
+    agent = make_agent(SleepTool("lookup", log), SleepTool("set", log, sequential=True))
+    calls = [("set", {"value": 1}), ("lookup", {"value": 2}), ("set", {"value": 3})]
+
+    started = time.monotonic()
+    results = turn(agent, calls)
+    elapsed = time.monotonic() - started
+
+    assert results == ["set:1", "lookup:2", "set:3"]
+    # Two sequential calls back to back; the parallel one overlaps them
+    assert elapsed < DELAY * 3
+    set_events = [value for _, name, value in log if name == "set"]
+    assert set_events == [1, 1, 3, 3]
+
+
+def test_identical_calls_share_one_run(turn):
+    log = []
+    tool = SleepTool("weather", log)
+    agent = make_agent(tool)
+    calls = [
+        ("weather", '{"value": "here", "x": 1}'),
+        ("weather", '{"x": 1, "value": "here"}'),
+        ("weather", {"value": "here", "x": 1}),
+        ("weather", '{"value": "there", "x": 1}'),
+    ]
+
+    results = turn(agent, calls)
+
+    assert results == ["weather:here", "weather:here", "weather:here", "weather:there"]
+    assert tool.calls == 2
+
+
+def test_progress_lines_are_reported_once_per_run():
+    log = []
+    agent = make_agent(SleepTool("a", log), SleepTool("s", log, sequential=True))
+    agent.tool_progress = True
+    calls = [("a", {"value": 1}), ("a", {"value": 1}), ("s", {"value": 2})]
+    start = agent._dedup_starts(agent._start_tool)
+    futures = [start(name, args) for name, args in calls]
+    results = []
+
+    lines = list(agent._finish_tools(calls, futures, results))
+
+    assert results == ["a:1", "a:1", "s:2"]
+    assert sorted(lines) == ["\n[a done]\n", "\n[s done]\n"]
+
+
+def test_args_key_is_canonical():
+    key = Agent._args_key
+    assert key('{"a": 1, "b": [1, 2]}') == key('{"b":[1,2],"a":1}') == key({"b": [1, 2], "a": 1})
+    assert key('{"a": 1}') != key('{"a": 2}')
+    # Unparseable arguments still get a stable key of their own
+    assert key("{not json") == key("{not json")
+    assert key("{not json") != key("{}")
+
+
+@pytest.mark.parametrize("raw", ["[1, 2]", '"text"', "3", "null", "true"])
+def test_parse_json_object_rejects_non_objects(raw):
+    with pytest.raises(ValueError, match="expected a JSON object"):
+        Agent._parse_json_object(raw)
+
+
+def test_parse_json_object():
+    assert Agent._parse_json_object('{"a": {"b": 1}}') == {"a": {"b": 1}}
+    assert Agent._parse_json_object("") == {}
+    with pytest.raises(ValueError):
+        Agent._parse_json_object("{broken")
+
+
+def test_malformed_arguments_are_reported_to_the_model():
+    log = []
+    tool = SleepTool("a", log)
+    agent = make_agent(tool)
+
+    assert run_turn(agent, [("a", "[1]")])[0].startswith("Tool argument error:")
+    assert tool.calls == 0
@@ -0,0 +1,61 @@
+"""FastRotatingFileHandler: rollover is decided by bytes on disk, not characters."""
+import logging
+import os
+
+import pytest
+
+from smart_home.config.logging import FastRotatingFileHandler
+
+MAX_BYTES = 2000
+
+
+def emit_all(handler, messages):
+    for message in messages:
+        handler.emit(logging.makeLogRecord({"msg": message, "levelno": logging.INFO}))
+    handler.close()
+
+
+def log_files(directory):
+    return {path.name: path.stat().st_size for path in directory.iterdir()}
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = FastRotatingFileHandler(tmp_path / "app.log", maxBytes=MAX_BYTES, backupCount=10, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def test_non_ascii_records_roll_over_at_max_bytes(tmp_path, handler):
+    # 3-byte UTF-8 characters: a character count would be a third of the real size
+    messages = [f"température {i:03d} ✓✓✓✓✓✓✓✓✓✓" for i in range(200)]
+
+    emit_all(handler, messages)
+
+    sizes = log_files(tmp_path)
+    assert len(sizes) > 1
+    assert all(size <= MAX_BYTES for size in sizes.values())
+    # Every rolled-over file was filled to within one record of the limit
+    record_size = max(len(m.encode("utf-8")) + len(os.linesep) for m in messages)
+    assert all(size > MAX_BYTES - record_size for name, size in sizes.items() if name != "app.log")
+
+
+def test_counter_matches_the_file_on_disk(tmp_path, handler):
+    emit_all(handler, ["ascii line", "ünïcödé line", "日本語の行"] * 20)
+
+    assert handler._size == (tmp_path / "app.log").stat().st_size
+
+
+def test_counter_starts_from_an_existing_file(tmp_path, handler):
+    (tmp_path / "app.log").write_bytes(b"x" * (MAX_BYTES - 10))
+
+    emit_all(handler, ["é" * 20])
+
+    assert log_files(tmp_path) == {"app.log": 20 * 2 + len(os.linesep), "app.log.1": MAX_BYTES - 10}
+
+
+def test_newline_translation_is_counted(handler):
+    handler._newline_extra = 1  # as on Windows, where "\n" is written as "\r\n"
+
+    assert handler._byte_size("a\nb\n") == 6
+    assert handler._byte_size("é\n") == 4
@@ -0,0 +1,134 @@
+"""Session persistence: atomic writes, unchanged-snapshot skipping, background coalescing."""
+import os
+import threading
+
+import orjson
+import pytest
+
+from smart_home.core import session as session_module
+from smart_home.core.session import Session, _SAVE_QUEUE
+
+
+@pytest.fixture(autouse=True)
+def sessions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_module, "SESSIONS_DIR", tmp_path)
+    yield tmp_path
+    # Background saves must land here, not in the real sessions/ directory
+    _SAVE_QUEUE.join()
+
+
+@pytest.fixture
+def replaces(monkeypatch):
+    """Records every os.replace the session module does."""
+    calls = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        calls.append((str(src), str(dst)))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(session_module.os, "replace", replace)
+    return calls
+
+
+def saved(sessions_dir, session):
+    return orjson.loads((sessions_dir / f"{session.session_id}.json").read_bytes())
+
+
+def test_save_writes_a_temp_file_and_renames_it_over_the_target(sessions_dir, replaces):
+    session = Session(metadata={"turn": 1})
+
+    session.save()
+
+    target = sessions_dir / f"{session.session_id}.json"
+    assert replaces == [(str(target.with_suffix(".json.tmp")), str(target))]
+    assert saved(sessions_dir, session)["metadata"] == {"turn": 1}
+    assert list(sessions_dir.iterdir()) == [target]
+
+
+def test_unchanged_snapshot_is_not_rewritten(replaces):
+    session = Session(metadata={"turn": 1})
+
+    session.save()
+    session.save()
+    assert len(replaces) == 1
+
+    session.metadata["turn"] = 2
+    session.save()
+    assert len(replaces) == 2
+
+
+def test_failed_write_keeps_the_previous_save_and_raises(sessions_dir, monkeypatch):
+    session = Session(metadata={"turn": 1})
+    session.save()
+
+    def disk_full(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(session_module.os, "replace", disk_full)
+    session.metadata["turn"] = 2
+    with pytest.raises(OSError):
+        session.save()
+
+    assert saved(sessions_dir, session)["metadata"] == {"turn": 1}
+    assert [p.name for p in sessions_dir.iterdir()] == [f"{session.session_id}.json"]
+
+    # The failed snapshot was not recorded as saved, so the next attempt writes it
+    monkeypatch.undo()
+    monkeypatch.setattr(session_module, "SESSIONS_DIR", sessions_dir)
+    session.save()
+    assert saved(sessions_dir, session)["metadata"] == {"turn": 2}
+
+
+def test_queued_snapshots_are_coalesced_to_the_newest(sessions_dir, monkeypatch):
+    session = Session(metadata={"turn": 0})
+    other = Session(metadata={"turn": 0})
+    real_write = Session._write
+    written = []
+    release = threading.Event()
+
+    def write(self, session_data):
+        written.append((self.session_id, session_data["metadata"]["turn"]))
+        if len(written) == 1:
+            release.wait(5)  # hold the worker while more turns are queued
+        real_write(self, session_data)
+
+    monkeypatch.setattr(Session, "_write", write)
+
+    session.save_async()
+    while not written:
+        threading.Event().wait(0.01)
+    for turn in range(1, 6):
+        session.metadata["turn"] = turn
+        session.save_async()
+    other.metadata["turn"] = 1
+    other.save_async()
+    release.set()
+    _SAVE_QUEUE.join()
+
+    assert written == [(session.session_id, 0), (session.session_id, 5), (other.session_id, 1)]
+    assert saved(sessions_dir, session)["metadata"] == {"turn": 5}
+    assert saved(sessions_dir, other)["metadata"] == {"turn": 1}
+
+
+def test_background_save_failure_reaches_the_next_save_async(sessions_dir, monkeypatch):
+    session = Session(metadata={"turn": 1})
+
+    def no_permission(self, session_data):
+        raise PermissionError(13, "Permission denied")
+
+    monkeypatch.setattr(Session, "_write", no_permission)
+    session.save_async()
+    _SAVE_QUEUE.join()
+    monkeypatch.undo()
+    monkeypatch.setattr(session_module, "SESSIONS_DIR", sessions_dir)
+
+    # The next save reports the failure, and its own snapshot is still written
+    session.metadata["turn"] = 2
+    with pytest.raises(PermissionError):
+        session.save_async()
+    _SAVE_QUEUE.join()
+    assert saved(sessions_dir, session)["metadata"] == {"turn": 2}
+
+    # Reported once, then cleared
+    session.save_async()